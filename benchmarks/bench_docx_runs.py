@@ -0,0 +1,122 @@
+"""
+Замена меток в абзацах с множеством run'ов: прежняя квадратичная реализация
+(пересборка текста после каждой замены) и нынешний проход за один раз.
+Сначала сверка на случайных разрезах run'ов, потом замер.
+    python benchmarks/bench_docx_runs.py [run'ов] [меток]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+
+from docx_render import _replace_in_paragraph_runs
+
+MAPPING = {"<<OBRASHENIE>>": "Уважаемая Анна Сергеевна", "<<TEXT>>": "С днём рождения!"}
+
+def replace_old(paragraph, mapping: dict[str, str]) -> None:
+    """_replace_in_paragraph_runs до переделки (эталон)."""
+    if not paragraph.runs:
+        return
+
+    full = "".join(r.text for r in paragraph.runs)
+    for ph, val in mapping.items():
+        if ph not in full:
+            continue
+
+        start = 0
+        while True:
+            idx = full.find(ph, start)
+            if idx == -1:
+                break
+            end = idx + len(ph)
+
+            spans = []
+            pos = 0
+            for ri, r in enumerate(paragraph.runs):
+                rt = r.text or ""
+                spans.append((ri, pos, pos + len(rt)))
+                pos += len(rt)
+
+            cover = []
+            for ri, a, b in spans:
+                if b <= idx:
+                    continue
+                if a >= end:
+                    break
+                cover.append((ri, a, b))
+            if not cover:
+                break
+
+            first_ri, first_a, _ = cover[0]
+            last_ri, last_a, _ = cover[-1]
+
+            prefix = paragraph.runs[first_ri].text[: max(0, idx - first_a)]
+            suffix = paragraph.runs[last_ri].text[max(0, end - last_a):]
+
+            paragraph.runs[first_ri].text = prefix + val + suffix
+            for ri, _, _ in cover[1:]:
+                paragraph.runs[ri].text = ""
+
+            full = "".join(r.text for r in paragraph.runs)
+            start = idx + len(val)
+
+def random_text(rnd: random.Random, n_placeholders: int) -> str:
+    words = ["Дорогие", "коллеги", ",", " ", "поздравляем", "<", ">", "<<", "текст"]
+    parts = []
+    for _ in range(n_placeholders):
+        parts.extend(rnd.choice(words) for _ in range(rnd.randint(0, 4)))
+        parts.append(rnd.choice(list(MAPPING)))
+    parts.extend(rnd.choice(words) for _ in range(rnd.randint(0, 4)))
+    return "".join(parts)
+
+def split_paragraph(doc, text: str, cuts: list[int]):
+    p = doc.add_paragraph()
+    prev = 0
+    for c in sorted(cuts) + [len(text)]:
+        r = p.add_run(text[prev:c])
+        r.bold = c % 3 == 0  # разное форматирование: видно, какой run что получил
+        prev = c
+    return p
+
+def run_state(p):
+    return [(r.text, r.bold) for r in p.runs]
+
+def check(cases: int = 2000):
+    rnd = random.Random(11)
+    doc = Document()
+    for _ in range(cases):
+        text = random_text(rnd, rnd.randint(1, 4))
+        cuts = [rnd.randint(0, len(text)) for _ in range(rnd.randint(0, 12))]
+        a = split_paragraph(doc, text, cuts)
+        b = split_paragraph(doc, text, cuts)
+        replace_old(a, MAPPING)
+        _replace_in_paragraph_runs(b, MAPPING)
+        assert run_state(a) == run_state(b), (text, cuts)
+    print(f"сверка: {cases} случайных разрезов — одинаково")
+
+def heavy_paragraph(doc, n_runs: int, n_placeholders: int):
+    rnd = random.Random(5)
+    filler = " коллеги," * (n_runs // (9 * n_placeholders) + 1)  # текста хватает на n_runs кусков
+    text = "".join(filler + rnd.choice(list(MAPPING)) for _ in range(n_placeholders)) + filler
+    cuts = rnd.sample(range(1, len(text)), n_runs - 1)
+    return split_paragraph(doc, text, cuts)
+
+def bench(n_runs: int, n_placeholders: int, repeat: int = 3):
+    doc = Document()
+    for label, fn in (("прежняя", replace_old), ("нынешняя", _replace_in_paragraph_runs)):
+        best = None
+        for _ in range(repeat):
+            p = heavy_paragraph(doc, n_runs, n_placeholders)
+            t0 = time.perf_counter()
+            fn(p, MAPPING)
+            dt = time.perf_counter() - t0
+            best = dt if best is None else min(best, dt)
+        print(f"{label}: {len(p.runs)} run'ов, {n_placeholders} меток — {best * 1000:.1f} мс на абзац")
+
+if __name__ == "__main__":
+    check()
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1500, int(sys.argv[2]) if len(sys.argv) > 2 else 50)
@@ -0,0 +1,58 @@
+"""
+ensure_columns: нормализация колонок построчно (как было) и norm_column.
+    python benchmarks/bench_norm.py [строк]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from model import TEXT_COLUMNS, norm_column
+
+def norm_str_old(s) -> str:
+    if s is None:
+        return ""
+    s = str(s).replace("\u00A0", " ")
+    s = s.strip()
+    s = re.sub(r"\s+", " ", s)
+    s = s.replace("Ё", "Е").replace("ё", "е")
+    return s
+
+def make_frame(n: int, dtype) -> pd.DataFrame:
+    rnd = random.Random(1)
+    surnames = ["Иванов", " Пётров", "Сидорова  ", "Ёлкин", "Хабибуллина"] + [f"Фам{i}" for i in range(n // 50)]
+    names = ["Анна", "Ильдар ", "Ильнар", " Алия", "Пётр"]
+    patrs = ["Ринатович", "Рустамовна", "Рустемовна ", "Иванович", ""]
+    return pd.DataFrame({
+        "Фамилия": [rnd.choice(surnames) for _ in range(n)],
+        "Имя": [rnd.choice(names) for _ in range(n)],
+        "Отчество": [rnd.choice(patrs) for _ in range(n)],
+        "E-mail": [f" user{i}@mail.ru " if i % 7 else None for i in range(n)],
+        "Пол (итог)": [rnd.choice(["Муж", "Жен", "", " Муж"]) for _ in range(n)],
+        "Пол (авто)": [""] * n,
+        "E-mail_Татцентр": [None] * n,
+        "URL Tatcenter": [""] * n,
+        "Дата рождения (Татцентр)": [""] * n,
+    }, dtype=dtype)
+
+def main(n: int):
+    # "str" — pandas 3; object — так текст читает pandas 2.x
+    for dtype in ("str", object):
+        df = make_frame(n, dtype)
+        t0 = time.perf_counter()
+        old = {c: df[c].apply(norm_str_old) for c in TEXT_COLUMNS}
+        t1 = time.perf_counter()
+        new = {c: norm_column(df[c]) for c in TEXT_COLUMNS}
+        t2 = time.perf_counter()
+        for c in TEXT_COLUMNS:
+            pd.testing.assert_series_equal(old[c], new[c], check_dtype=False)
+        print(f"{n} строк, {len(TEXT_COLUMNS)} колонок, dtype={df['Имя'].dtype}: построчно {t1 - t0:.2f} с, "
+              f"norm_column {t2 - t1:.2f} с (×{(t1 - t0) / max(t2 - t1, 1e-9):.1f})")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,42 @@
+"""
+Колонки статуса: построчно через compute_status_row (как было) и status_frame.
+    python benchmarks/bench_status.py [строк]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from model import DataModel, status_frame
+
+def make_frame(n: int) -> pd.DataFrame:
+    rnd = random.Random(3)
+    return pd.DataFrame({
+        "Пол (итог)": [rnd.choice(["Муж", "Жен", "", " Муж "]) for _ in range(n)],
+        "E-mail": [rnd.choice([f"user{i}@mail.ru", "", "нет", f"a{i}@b", f" x{i}@y.ru "]) for i in range(n)],
+    }, dtype="str")
+
+def main(n: int):
+    df = make_frame(n)
+    m = DataModel()
+    t0 = time.perf_counter()
+    old = df.apply(m.compute_status_row, axis=1).tolist()  # так фильтры и счётчики считали раньше
+    t1 = time.perf_counter()
+    new = status_frame(df)
+    t2 = time.perf_counter()
+    assert old == list(zip(new["gender_ok"], new["email_ok"], new["status"]))
+
+    m.df = df
+    m.refresh_status()
+    t3 = time.perf_counter()
+    m.set_cell(df.index[n // 2], "E-mail", "new@mail.ru")
+    t4 = time.perf_counter()
+    print(f"{n} строк: построчно {t1 - t0:.2f} с, status_frame {t2 - t1:.3f} с (×{(t1 - t0) / (t2 - t1):.0f}); "
+          f"правка одной ячейки {1000 * (t4 - t3):.1f} мс")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
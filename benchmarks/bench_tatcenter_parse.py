@@ -0,0 +1,43 @@
+"""
+Разбор страниц Tatcenter: прежний путь (BeautifulSoup) и нынешний (lxml + XPath),
+страниц в секунду на сохранённых страницах из tests/fixtures/tatcenter
+(одинаковость результатов проверяет tests/test_tatcenter_parse.py).
+    python benchmarks/bench_tatcenter_parse.py [повторов]
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import tatcenter
+
+FIXTURES = os.path.join(ROOT, "tests", "fixtures", "tatcenter")
+
+def load(prefix: str) -> list[str]:
+    out = []
+    for name in sorted(os.listdir(FIXTURES)):
+        if name.startswith(prefix):
+            with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+                out.append(f.read())
+    return out
+
+def rate(fn, pages: list[str], repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            fn(html)
+    return repeat * len(pages) / (time.perf_counter() - t0)
+
+def main(repeat: int):
+    for label, pages, before, after in [
+        ("поиск", load("search_"), tatcenter._person_url_bs4, tatcenter.extract_person_url),
+        ("человек", load("person_"), tatcenter._person_info_bs4, tatcenter.extract_person_info),
+    ]:
+        b = rate(before, pages, repeat)
+        a = rate(after, pages, repeat)
+        print(f"{label}: bs4 {b:.0f} стр/с, lxml {a:.0f} стр/с (×{a / b:.1f})")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -1,3 +1,4 @@
+import os
 import platform
 
 BASE_URL = "https://tatcenter.ru"
@@ -9,4 +10,69 @@ HEADERS = {
     )
 }
 
-WIN = platform.system().lower().startswith("win")
\ No newline at end of file
+WIN = platform.system().lower().startswith("win")
+
+# Tatcenter: параллельный поиск
+TC_RPS = 2.0            # общий лимит запросов в секунду (на все потоки)
+TC_MAX_IN_FLIGHT = 4    # не больше стольких запросов одновременно
+
+# Кэш между запусками (Tatcenter и т.п.) — в пользовательской папке кэша
+def _user_cache_dir() -> str:
+    if WIN:
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+    elif platform.system() == "Darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "postcard_app")
+
+CACHE_DIR = _user_cache_dir()
+
+# Tatcenter: сколько живут записи кэша (сутки)
+TC_CACHE_TTL_FOUND_DAYS = 180       # найденные URL / e-mail / дата рождения
+TC_CACHE_TTL_NOT_FOUND_DAYS = 14    # «не найден» — перепроверяем чаще
+
+# Tatcenter: HTTP-клиент
+TC_TIMEOUT = (5, 20)      # (connect, read), секунды
+TC_RETRIES = 4            # повторов на запрос при 5xx/429/обрыве связи
+TC_BACKOFF = 1.0          # базовая пауза перед повтором, растёт как 2**попытка
+TC_BACKOFF_MAX = 60.0     # потолок своей паузы между повторами
+TC_RETRY_AFTER_MAX = 600.0  # Retry-After дольше этого — ошибка сразу, без повторов
+
+# DOCX: параллельная сборка в нескольких процессах
+DOCX_PROCESSES = os.cpu_count() or 1
+DOCX_PARALLEL_MIN_ROWS = 40   # на меньших пачках запуск процессов дороже выигрыша
+DOCX_ZIP_COPY = True          # писать DOCX на уровне zip: картинки/шрифты шаблона копируются как есть
+
+# PDF-шаблон: открытки сразу в PDF через PyMuPDF, без DOCX и Word
+PDF_FONT_FILE = ""            # .ttf/.otf с кириллицей; пусто — встроенный Times (Nimbus Roman)
+PDF_DEFAULT_FONTSIZE = 12.0   # если кегль метки/поля не удалось определить
+PDF_MIN_FONTSIZE = 7.0        # длинный текст ужимается не мельче этого
+
+# DOCX→PDF: пул конвертеров (Word / LibreOffice)
+PDF_BACKEND = ""           # "word", "libreoffice", "stub"; пусто — первый доступный
+PDF_WORKERS = 2            # сколько экземпляров конвертера параллельно
+PDF_TIMEOUT = 120.0        # секунд на один документ; дольше — документ ошибка, конвертер перезапускается
+PDF_RECYCLE_AFTER = 200    # перезапуск конвертера после стольких документов
+
+# Сжатие PDF перед рассылкой
+PDF_OPT_DPI = 150                       # картинки выше ~1.2×DPI уменьшаются до этого DPI
+PDF_OPT_JPEG_QUALITY = 80
+PDF_OPT_PROCESSES = os.cpu_count() or 1
+
+# Превью PDF
+PREVIEW_MAX_DOCS = 8        # открытых PDF в кэше
+PREVIEW_CACHE_MB = 128      # готовых картинок превью, МБ
+PREVIEW_PREFETCH = 2        # сколько соседних строк сверху/снизу рисовать заранее
+PREVIEW_DRAFT_SCALE = 0.3   # черновик превью — в такой доле от полного разрешения
+
+# Миниатюры (сетка для просмотра всей пачки)
+THUMB_WIDTH = 180
+THUMB_PROCESSES = max(1, (os.cpu_count() or 2) - 1)   # одно ядро остаётся окну
+
+# Поиск в таблице
+SEARCH_DEBOUNCE_MS = 150    # фильтр применяется после такой паузы в наборе
+
+# Загрузка Excel: нормализованная таблица кэшируется рядом (Feather, без pyarrow — pickle)
+EXCEL_CACHE_DIR = os.path.join(CACHE_DIR, "excel")
+EXCEL_CACHE_KEEP = 8        # сколько последних книг держать в кэше
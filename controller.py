@@ -1,19 +1,35 @@
 import os
-import time
 import shutil
 from datetime import datetime
+from itertools import chain
 
 import pandas as pd
-import requests
-from docx import Document
 
-from model import DataModel
-from utils import norm_str, is_email_like, build_obrashenie, open_path
-from tatcenter import fio_for_search_row, search_person_url, parse_person_page
-from docx_render import replace_placeholders_docx
-from win_word_pdf import word_export_pdf_batch
-from win_outlook import outlook_send_mail, outlook_list_accounts
-from config import WIN
+from model import DataModel, email_like_mask
+from utils import norm_str, is_email_like, build_obrashenie, open_path, fio_key
+from tatcenter import fio_for_search_row, iter_lookups, TatcenterResult, PersonPageMemo
+from tatcenter_cache import TatcenterCache
+from tatcenter_http import TatcenterClient
+from tatcenter_journal import FetchJournal, JOURNAL_NAME
+from fio_index import FioIndex
+from docx_template import CompiledTemplate, render_parallel
+from pdf_template import PdfTemplate
+from manifest import BuildManifest, MANIFEST_NAME, file_hash, row_hash
+from pdf_convert import pick_backend, convert_batch
+from pdf_merge import merge_pdfs
+from pdf_optimize import optimize_batch
+from win_outlook import outlook_send_mail, AccountRegistry
+from pdf_inventory import PdfInventory
+from excel_loader import read_excel_fast, load_cached, save_cached
+from config import WIN, TC_RPS, TC_MAX_IN_FLIGHT, DOCX_PROCESSES, DOCX_PARALLEL_MIN_ROWS
+
+def _stat_sig(path: str):
+    """(размер, mtime) файла/папки или None; у папки mtime меняется, когда в ней удаляют/создают файлы."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
 
 class AppController:
     """
@@ -22,6 +38,16 @@ class AppController:
     """
     def __init__(self, model: DataModel):
         self.m = model
+        self.accounts = AccountRegistry()
+        self.pdf_inventory = PdfInventory()
+        # stale_counts: по строке (файл, DOCX устарел, PDF устарел), пересчёт — только правленых
+        self._stale_base = None
+        self._stale_version = 0
+        self._stale_rows: dict = {}
+        self._stale_man = None
+        self._stale_res = None
+        self._backend = None
+        self._backend_checked = False
 
     # ---- project / file system ----
     def open_result(self):
@@ -30,35 +56,91 @@ class AppController:
         open_path(self.m.result_dir())
 
     def outlook_accounts(self) -> list[str]:
-        return outlook_list_accounts()
+        """Аккаунты из кэша (без COM); перечитать — self.accounts.refresh()."""
+        return list(self.accounts.accounts)
+
+    def pdf_count(self) -> int:
+        """Сколько PDF в RESULT/PDF (по инвентарю, без чтения папки на каждый вызов)."""
+        if not self.m.state.project_dir:
+            return 0
+        self.pdf_inventory.attach(os.path.join(self.m.state.project_dir, "RESULT", "PDF"))
+        return self.pdf_inventory.count()
 
     # ---- excel / template ----
     def load_excel(self, path: str):
-        df = pd.read_excel(path)
-        self.m.df = self.m.ensure_columns(df)
+        # та же книга (по содержимому) уже открывалась — берём готовую таблицу из кэша
+        df, sha = load_cached(path)
+        if df is not None:
+            self.m.df = df
+            self.m.state.excel_path = path
+            self.m.rows_changed()
+            return
+        self.m.df = self.m.ensure_columns(read_excel_fast(path))
         self.m.state.excel_path = path
         self.m.apply_auto_gender()
+        save_cached(path, sha, self.m.df)
 
     def load_template(self, path: str):
         self.m.state.template_path = path
+        self.pdf_backend(refresh=True)  # заодно перепроверить Word/LibreOffice
 
     def set_project_dir(self, d: str):
         self.m.state.project_dir = d
         self.m.ensure_result_dirs()
+        self.pdf_inventory.attach(os.path.join(d, "RESULT", "PDF"))
 
     # ---- tatcenter ----
+    def _apply_tc_result(self, idx, res: TatcenterResult) -> bool:
+        """Пишет результат Tatcenter в df. True — найден годный e-mail."""
+        df = self.m.df
+        ok = bool(res.url and res.email and is_email_like(res.email))
+        if ok:
+            df.at[idx, "E-mail_Татцентр"] = norm_str(res.email)
+            df.at[idx, "URL Tatcenter"] = res.url
+        if res.url and res.dob:
+            df.at[idx, "Дата рождения (Татцентр)"] = norm_str(res.dob)
+        return ok
+
+    def _tc_journal(self) -> FetchJournal | None:
+        if not self.m.state.project_dir:
+            return None  # журнал живёт в RESULT — без папки проекта не пишем
+        return FetchJournal(self.m.result_dir(JOURNAL_NAME), self.m.state.excel_path)
+
+    def _tc_replay_journal(self, journal: FetchJournal) -> set:
+        """Применяет к df исходы прошлого незавершённого запуска; возвращает уже обработанные индексы."""
+        df = self.m.df
+        done = set()
+        for rec in journal.entries():
+            idx = rec.get("idx")
+            if rec.get("status") not in ("found", "not_found") or idx not in df.index:
+                continue
+            if fio_key(fio_for_search_row(df.loc[idx])) != fio_key(rec.get("fio", "")):
+                continue  # строки переставили/поменяли — пусть ищется заново
+            self._apply_tc_result(idx, TatcenterResult(email=rec.get("email", ""), url=rec.get("url", ""), dob=rec.get("dob", "")))
+            done.add(idx)
+        return done
+
     def tatcenter_fetch(
         self,
         only_indices: list[int] | None,
         progress_cb,
         message_cb,
-        pause: float = 1.0,
+        rps: float = TC_RPS,
+        max_in_flight: int = TC_MAX_IN_FLIGHT,
+        use_cache: bool = True,
     ) -> dict:
         if self.m.df is None:
             raise RuntimeError("Сначала загрузите Excel.")
 
         df = self.m.df
 
+        # прошлый запуск оборвался — сначала возвращаем найденное из журнала
+        journal = self._tc_journal()
+        done = set()
+        if journal is not None:
+            done = self._tc_replay_journal(journal)
+            journal.open(keep=bool(done))
+
         def needs_tc(row):
             main = norm_str(row.get("E-mail", ""))
             tc = norm_str(row.get("E-mail_Татцентр", ""))
@@ -71,111 +153,388 @@ class AppController:
         else:
             targets = df[df.apply(needs_tc, axis=1)]
             scope_text = "всем строкам"
+        if done:
+            targets = targets[~targets.index.isin(list(done))]
 
         if targets.empty:
-            return {"scope": scope_text, "found": 0, "not_found": 0, "errors": 0, "total": 0}
+            if journal is not None:
+                journal.finish()
+            return {
+                "scope": scope_text, "found": 0, "not_found": 0, "errors": 0, "total": 0,
+                "cached": 0, "resumed": len(done), "unique": 0, "reordered": 0, "by_candidate": 0,
+                "dedup_saved": 0,
+                "error_messages": [], "http": None,
+            }
 
-        session = requests.Session()
-        found = not_found = errors = 0
-        total = len(targets)
+        cache = None
+        if use_cache:
+            try:
+                cache = TatcenterCache()
+            except Exception:
+                cache = None  # кэш — ускоритель, без него поиск всё равно работает
 
-        for n, (idx, row) in enumerate(targets.iterrows(), start=1):
+        # план: одинаковые ФИО (дубли строк) ищем один раз, результат раздаём всем строкам
+        groups: dict[str, list] = {}
+        fio_of: dict[str, str] = {}
+        for idx, row in targets.iterrows():
             fio = fio_for_search_row(row)
-            message_cb(f"[{n}/{total}] {fio}")
-            progress_cb(n, total)
-
-            try:
-                url = search_person_url(session, fio)
-                time.sleep(pause)
-                if not url:
-                    not_found += 1
+            key = fio_key(fio)
+            groups.setdefault(key, []).append(idx)
+            fio_of.setdefault(key, fio)
+
+        # что можно — отвечаем из кэша, в сеть идут только новые/устаревшие записи;
+        # ФИО, которых нет в кэше дословно: тот же человек с другим порядком слов — из индекса;
+        # похожие ФИО (опечатка) — кандидаты, которые проверяются по странице человека
+        index = FioIndex.from_pairs(cache.found_people()) if cache else None
+        from_index: set[str] = set()
+        offline = []
+        items = []
+        for key, fio in fio_of.items():
+            url = cache.get_search(fio) if cache else None
+            if url is None and index:
+                url = index.best(fio)
+                if url:
+                    from_index.add(key)
+            if url == "":
+                offline.append((key, fio, TatcenterResult(), None))
+                continue
+            person = cache.get_person(url) if (cache and url) else None
+            if person is not None:
+                offline.append((key, fio, TatcenterResult(email=person[0], url=url, dob=person[1]), None))
+                continue
+            # устаревшая страница человека: условный GET по ETag/Last-Modified
+            stale = cache.get_person_validators(url) if (cache and url) else None
+            cached = None
+            if stale is not None:
+                cached = TatcenterResult(email=stale[0], url=url, dob=stale[1], etag=stale[2], last_modified=stale[3])
+            candidates = index.candidates(fio) if (index and not url) else []
+            items.append((key, fio, url, cached, candidates))
+        known_url = {key for key, _fio, url, _c, _cands in items if url}
+        by_candidate: set[str] = set()
+
+        client = TatcenterClient(rps=rps, pool_size=max_in_flight)
+        memo = PersonPageMemo()
+        found = not_found = errors = 0
+        cached_rows = dedup_saved = 0
+        error_messages: list[str] = []
+        total = len(targets)
+        n = 0
+
+        # сеть — в потоках, запись в df и callbacks — только здесь (в вызывающем потоке)
+        try:
+            lookups = chain(offline, iter_lookups(client, items, max_in_flight, memo) if items else ())
+            for k, (key, fio, res, err) in enumerate(lookups, start=1):
+                rows = groups[key]
+                n += len(rows)
+                message_cb(f"[{n}/{total}] {fio}" + (f" (×{len(rows)})" if len(rows) > 1 else ""))
+                progress_cb(n, total)
+
+                if err is not None:
+                    errors += len(rows)
+                    if len(error_messages) < 5:
+                        error_messages.append(f"{fio}: {err}")
+                    if journal is not None:
+                        for idx in rows:
+                            journal.append(idx, fio, "error")
                     continue
-
-                email, dob = parse_person_page(session, url)
-                time.sleep(pause)
-
-                if email and is_email_like(email):
-                    df.at[idx, "E-mail_Татцентр"] = norm_str(email)
-                    df.at[idx, "URL Tatcenter"] = url
-                    found += 1
+                if k <= len(offline):  # первые len(offline) — уже из кэша
+                    cached_rows += len(rows)
                 else:
-                    not_found += 1
-
-                if dob:
-                    df.at[idx, "Дата рождения (Татцентр)"] = norm_str(dob)
-
-            except Exception:
-                errors += 1
-
-        return {"scope": scope_text, "found": found, "not_found": not_found, "errors": errors, "total": total}
+                    # каждая строка-дубль стоила бы свой поиск (если URL не был известен) и страницу
+                    dedup_saved += (len(rows) - 1) * ((key not in known_url) + bool(res.url))
+                    if res.by_candidate:
+                        by_candidate.add(key)
+                    if cache is not None:
+                        if key not in from_index:  # догадку индекса не выдаём за ответ поиска
+                            cache.put_search(fio, res.url)
+                        if res.url:
+                            cache.put_person(res.url, res.email, res.dob, res.etag, res.last_modified)
+
+                for idx in rows:
+                    if self._apply_tc_result(idx, res):
+                        found += 1
+                        status = "found"
+                    else:
+                        not_found += 1
+                        status = "not_found"
+                    if journal is not None:
+                        journal.append(idx, fio, status, res.email, res.url, res.dob)
+        finally:
+            client.close()
+            if cache is not None:
+                cache.close()
+            if journal is not None:
+                journal.close()
+
+        # всё прошло без ошибок — продолжать нечего; с ошибками журнал остаётся
+        # и следующий запуск повторит только их
+        if journal is not None and errors == 0:
+            journal.finish()
+
+        return {
+            "scope": scope_text, "found": found, "not_found": not_found, "errors": errors, "total": total,
+            "cached": cached_rows, "resumed": len(done), "unique": len(groups),
+            "reordered": len(from_index), "by_candidate": len(by_candidate),
+            "dedup_saved": dedup_saved + memo.shared, "error_messages": error_messages,
+            "http": client.stats.summary(),
+        }
 
     def apply_tatcenter_to_main_email(self) -> int:
         if self.m.df is None:
             return 0
         df = self.m.df
 
-        def can_apply(row):
-            main = norm_str(row.get("E-mail", ""))
-            tc = norm_str(row.get("E-mail_Татцентр", ""))
-            return (not is_email_like(main)) and is_email_like(tc)
-
-        mask = df.apply(can_apply, axis=1)
+        mask = ~email_like_mask(df["E-mail"]) & email_like_mask(df["E-mail_Татцентр"])
         cnt = int(mask.sum())
         if cnt:
             df.loc[mask, "E-mail"] = df.loc[mask, "E-mail_Татцентр"]
+            self.m.rows_changed(df.index[mask])
         return cnt
 
     # ---- docx/pdf ----
-    def generate_docx(self, common_text: str, progress_cb, message_cb):
+    def _manifest(self) -> BuildManifest:
+        return BuildManifest(self.m.result_dir(MANIFEST_NAME))
+
+    def _row_tasks(self, common_text: str, path_for) -> list:
+        """[(idx, out_path, mapping, row_hash), ...]; при совпадающих именах файлов остаётся последняя строка."""
+        tpl_hash = file_hash(self.m.state.template_path)
+        text = (common_text or "").rstrip("\n")
+        tasks = {}
+        for idx, row in self.m.df.iterrows():
+            out_path = path_for(idx)
+            obr = build_obrashenie(row["Имя"], row["Отчество"], row["Пол (итог)"])
+            mapping = {"<<OBRASHENIE>>": obr, "<<TEXT>>": text}
+            tasks.pop(out_path, None)
+            tasks[out_path] = (idx, out_path, mapping, row_hash(tpl_hash, text, obr, os.path.basename(out_path)))
+        return list(tasks.values())
+
+    def _stale_row(self, row, tpl_hash: str, text: str, man: BuildManifest, docx_dir, pdf_dir: str) -> tuple:
+        """(файл строки, DOCX устарел, PDF устарел) — то же, что даёт _row_tasks, но без makedirs."""
+        base = self.m.base_name_for_row(row)
+        pdf_path = os.path.join(pdf_dir, base + ".pdf")
+        obr = build_obrashenie(row["Имя"], row["Отчество"], row["Пол (итог)"])
+        if docx_dir is None:  # PDF-шаблон: DOCX нет
+            h = row_hash(tpl_hash, text, obr, os.path.basename(pdf_path))
+            return pdf_path, False, not man.is_fresh("pdf", pdf_path, h)
+        docx_path = os.path.join(docx_dir, base + ".docx")
+        h = row_hash(tpl_hash, text, obr, os.path.basename(docx_path))
+        return docx_path, not man.is_fresh("docx", docx_path, h), not man.is_fresh("pdf", pdf_path, h)
+
+    def stale_counts(self, common_text: str) -> dict | None:
+        """Сколько DOCX/PDF нужно пересобрать под текущие данные; None — считать не из чего."""
+        if self.m.df is None or not self.m.state.project_dir or not self.m.state.template_path:
+            return None
+        # всё, кроме самих строк: текст, шаблон, манифест, содержимое папок DOCX/PDF —
+        # поменялось что-то из этого, пересчитываем все строки, иначе только правленые
+        try:
+            tpl_st = os.stat(self.m.state.template_path)
+        except OSError:
+            return None
+        result_dir = os.path.join(self.m.state.project_dir, "RESULT")
+        pdf_mode = self.m.template_is_pdf()
+        self.pdf_count()  # дешёвая проверка папки PDF
+        base = (
+            common_text, self.m.state.project_dir, self.m.state.template_path, pdf_mode,
+            tpl_st.st_size, tpl_st.st_mtime_ns, _stat_sig(os.path.join(result_dir, MANIFEST_NAME)),
+            _stat_sig(os.path.join(result_dir, "DOCX")), self.pdf_inventory.version,
+        )
+        df = self.m.df
+        changed = self.m.changed_since(self._stale_version) if base == self._stale_base else None
+        if changed is None:
+            self._stale_rows = {}
+            self._stale_man = BuildManifest(os.path.join(result_dir, MANIFEST_NAME))
+            changed = df.index
+        elif not changed:
+            return dict(self._stale_res)
+
+        tpl_hash = file_hash(self.m.state.template_path)
+        text = (common_text or "").rstrip("\n")
+        docx_dir = None if pdf_mode else os.path.join(result_dir, "DOCX")
+        pdf_dir = os.path.join(result_dir, "PDF")
+        for idx in changed:
+            self._stale_rows.pop(idx, None)
+        sub = df.loc[df.index.isin(list(changed)), ["Фамилия", "Имя", "Отчество", "Пол (итог)"]]
+        for idx, row in zip(sub.index, sub.to_dict("records")):
+            self._stale_rows[idx] = self._stale_row(row, tpl_hash, text, self._stale_man, docx_dir, pdf_dir)
+
+        # при совпадающих именах файлов считается последняя строка (как в _row_tasks)
+        last = {self._stale_rows[idx][0]: idx for idx in df.index}
+        rows = [self._stale_rows[idx] for idx in last.values()]
+        res = {"docx": sum(r[1] for r in rows), "pdf": sum(r[2] for r in rows)}
+        self._stale_base, self._stale_version, self._stale_res = base, self.m.data_version, res
+        return dict(res)
+
+    def generate_docx(self, common_text: str, progress_cb, message_cb, processes: int = DOCX_PROCESSES) -> dict:
         if self.m.df is None:
             raise RuntimeError("Сначала загрузите Excel.")
         if not self.m.state.project_dir:
             raise RuntimeError("Выберите папку проекта.")
         if not self.m.state.template_path:
             raise RuntimeError("Выберите шаблон DOCX.")
+        if self.m.template_is_pdf():
+            raise RuntimeError("Выбран PDF-шаблон: DOCX не нужен, собирайте сразу PDF.")
 
         df = self.m.df
         docx_dir = self.m.result_dir("DOCX")
-
-        total = len(df)
-        for n, (idx, row) in enumerate(df.iterrows(), start=1):
-            message_cb(f"[{n}/{total}] {row['Фамилия']} {row['Имя']}")
-            progress_cb(n, total)
-
-            doc = Document(self.m.state.template_path)
-            mapping = {
-                "<<OBRASHENIE>>": build_obrashenie(row["Имя"], row["Отчество"], row["Пол (итог)"]),
-                "<<TEXT>>": (common_text or "").rstrip("\n"),
-            }
-            replace_placeholders_docx(doc, mapping)
-            out_path = self.m.docx_path_for_idx(idx)
-            doc.save(out_path)
-
-        return docx_dir
-
-    def generate_pdf(self):
+        man = self._manifest()
+
+        # собираем только строки, у которых поменялись данные/шаблон/текст или пропал файл
+        all_tasks = self._row_tasks(common_text, self.m.docx_path_for_idx)
+        tasks = [t for t in all_tasks if not man.is_fresh("docx", t[1], t[3])]
+        hashes = {idx: (out_path, h) for idx, out_path, _m, h in tasks}
+        labels = {idx: f"{df.at[idx, 'Фамилия']} {df.at[idx, 'Имя']}" for idx, *_ in tasks}
+        result = {"dir": docx_dir, "built": len(tasks), "skipped": len(all_tasks) - len(tasks)}
+        if not tasks:
+            return result
+
+        total = len(tasks)
+        try:
+            if processes > 1 and total >= DOCX_PARALLEL_MIN_ROWS:
+                done = 0
+                errors = []
+
+                def on_row(idx, err):
+                    nonlocal done
+                    done += 1
+                    if err:
+                        errors.append(f"{labels[idx]}: {err}")
+                    else:
+                        man.record("docx", *hashes[idx])
+                    message_cb(f"[{done}/{total}] {labels[idx]}")
+                    progress_cb(done, total)
+
+                render_parallel(self.m.state.template_path, [t[:3] for t in tasks], processes, on_row)
+                if errors:
+                    raise RuntimeError(f"Не удалось собрать DOCX: {len(errors)} из {total}.\n" + "\n".join(errors[:5]))
+                return result
+
+            # шаблон разбираем один раз, дальше только заполняем слоты
+            tpl = CompiledTemplate(self.m.state.template_path)
+            for n, (idx, out_path, mapping, h) in enumerate(tasks, start=1):
+                message_cb(f"[{n}/{total}] {labels[idx]}")
+                progress_cb(n, total)
+                tpl.save(out_path, mapping)
+                man.record("docx", out_path, h)
+        finally:
+            man.save()  # даже после ошибки — готовые строки второй раз не собираем
+
+        return result
+
+    def generate_pdf(self, common_text: str = "", progress_cb=None, message_cb=None) -> dict:
         if self.m.df is None:
             raise RuntimeError("Сначала загрузите Excel.")
         if not self.m.state.project_dir:
             raise RuntimeError("Выберите папку проекта.")
-        if not WIN:
-            raise RuntimeError("Сборка PDF доступна только на Windows (Word + pywin32).")
+        if self.m.template_is_pdf():
+            return self._generate_pdf_from_template(common_text, progress_cb or (lambda *_: None), message_cb or (lambda *_: None))
+        backend = self.pdf_backend(refresh=True)
+        if backend is None:
+            raise RuntimeError("Нет конвертера DOCX→PDF: нужен Word (Windows + pywin32) или LibreOffice.")
 
         df = self.m.df
         docx_dir = self.m.result_dir("DOCX")
         pdf_dir = self.m.result_dir("PDF")
+        progress_cb = progress_cb or (lambda *_: None)
+        message_cb = message_cb or (lambda *_: None)
 
         if not os.path.isdir(docx_dir) or not os.listdir(docx_dir):
             raise RuntimeError("Сначала собери DOCX (кнопка «Собрать DOCX»).")
 
-        docx_paths = []
-        pdf_paths = []
-        for idx, _row in df.iterrows():
-            docx_paths.append(self.m.docx_path_for_idx(idx))
-            pdf_paths.append(self.m.pdf_path_for_idx(idx))
-
-        word_export_pdf_batch(docx_paths, pdf_paths)
-        return pdf_dir
+        # PDF актуален, если собран из текущего DOCX (тот же хэш) и не тронут
+        man = self._manifest()
+        jobs = {}
+        labels = {}
+        seen: set[str] = set()   # строки с одним и тем же PDF — один файл, одна работа
+        for idx, row in df.iterrows():
+            docx_path = self.m.docx_path_for_idx(idx)
+            pdf_path = self.m.pdf_path_for_idx(idx)
+            if pdf_path in seen:
+                continue
+            seen.add(pdf_path)
+            h = man.built_hash("docx", docx_path)
+            if h is not None and man.is_fresh("pdf", pdf_path, h):
+                continue
+            jobs[pdf_path] = (docx_path, h)
+            labels[pdf_path] = f"{row['Фамилия']} {row['Имя']}"
+
+        total = len(jobs)
+        done = 0
+        errors: list[str] = []
+
+        def on_doc(pdf_path, err):
+            nonlocal done
+            done += 1
+            if err:
+                errors.append(f"{labels[pdf_path]}: {err}")
+            else:
+                self.pdf_inventory.add(pdf_path)
+                h = jobs[pdf_path][1]
+                if h is not None:  # DOCX собран до манифеста — хэша нет, в следующий раз соберём снова
+                    man.record("pdf", pdf_path, h)
+            message_cb(f"[{done}/{total}] {labels[pdf_path]}")
+            progress_cb(done, total)
+
+        # строки без DOCX — сразу ошибка строки, конвертер их не видит
+        todo = []
+        for pdf_path, (docx_path, _h) in jobs.items():
+            if os.path.exists(docx_path):
+                todo.append((pdf_path, docx_path, pdf_path))
+            else:
+                on_doc(pdf_path, "нет DOCX")
+
+        try:
+            convert_batch(todo, on_doc, backend)
+        finally:
+            man.save()
+            self.pdf_inventory.sync()
+        return {
+            "dir": pdf_dir, "built": total - len(errors), "skipped": len(seen) - total,
+            "errors": len(errors), "error_messages": errors[:5],
+        }
+
+    def _generate_pdf_from_template(self, common_text: str, progress_cb, message_cb) -> dict:
+        """PDF-шаблон: текст пишется прямо в копию страницы шаблона (PyMuPDF), работает и не на Windows."""
+        df = self.m.df
+        pdf_dir = self.m.result_dir("PDF")
+        man = self._manifest()
+
+        all_tasks = self._row_tasks(common_text, self.m.pdf_path_for_idx)
+        tasks = [t for t in all_tasks if not man.is_fresh("pdf", t[1], t[3])]
+        result = {
+            "dir": pdf_dir, "built": len(tasks), "skipped": len(all_tasks) - len(tasks),
+            "errors": 0, "error_messages": [],
+        }
+        if not tasks:
+            return result
+
+        tpl = PdfTemplate(self.m.state.template_path)
+        total = len(tasks)
+        try:
+            for n, (idx, out_path, mapping, h) in enumerate(tasks, start=1):
+                message_cb(f"[{n}/{total}] {df.at[idx, 'Фамилия']} {df.at[idx, 'Имя']}")
+                progress_cb(n, total)
+                tpl.save(out_path, mapping)
+                man.record("pdf", out_path, h)
+                self.pdf_inventory.add(out_path)
+        finally:
+            man.save()
+            self.pdf_inventory.sync()
+        return result
+
+    def can_build_pdf(self) -> bool:
+        """Есть чем собрать PDF: PDF-шаблон (PyMuPDF) или конвертер DOCX→PDF."""
+        return self.m.template_is_pdf() or self.pdf_backend() is not None
+
+    def pdf_backend(self, refresh: bool = False) -> str | None:
+        """
+        Конвертер DOCX→PDF (pick_backend) из кэша: поиск soffice по PATH — это
+        stat на каждый каталог, а can_build_pdf зовётся при каждом обновлении окна.
+        refresh — искать заново (выбор шаблона, сборка PDF).
+        """
+        if refresh or not self._backend_checked:
+            self._backend = pick_backend()
+            self._backend_checked = True
+        return self._backend
 
     def export_pdf_files(self, dest_dir: str) -> dict:
         if self.m.df is None:
@@ -201,6 +560,83 @@ class AppController:
 
         return {"copied": copied, "missing": missing, "errors": errors, "dest": dest_dir}
 
+    def merge_print_pdf(self, order: list[int] | None, only_checked: bool, out_path: str, progress_cb, message_cb) -> dict:
+        """Один PDF для печати: открытки в порядке order (текущий вид таблицы)."""
+        if self.m.df is None:
+            raise RuntimeError("Сначала загрузите Excel.")
+        if not self.m.state.project_dir:
+            raise RuntimeError("Выберите папку проекта.")
+
+        df = self.m.df
+        paths = []
+        for idx in (order if order is not None else list(df.index)):
+            if only_checked and not bool(df.at[idx, "Отправлять"]):
+                continue
+            path = self.m.pdf_path_for_idx(idx)
+            if path not in paths:
+                paths.append(path)
+        if not paths:
+            raise RuntimeError("Нет строк для печати.")
+
+        def p(n, total):
+            message_cb(f"[{n}/{total}] {os.path.basename(paths[n - 1])}")
+            progress_cb(n, total)
+
+        return merge_pdfs(paths, out_path, p)
+
+    def optimize_pdfs(self, progress_cb, message_cb) -> dict:
+        """Сжимает PDF из RESULT/PDF перед рассылкой; уже сжатые (тот же хэш) пропускаются."""
+        if self.m.df is None:
+            raise RuntimeError("Сначала загрузите Excel.")
+        if not self.m.state.project_dir:
+            raise RuntimeError("Выберите папку проекта.")
+
+        man = self._manifest()
+        paths = []
+        skipped = 0
+        for idx in self.m.df.index:
+            path = self.m.pdf_path_for_idx(idx)
+            if path in paths or not os.path.exists(path):
+                continue
+            if man.built_hash("opt", path) is not None:
+                skipped += 1
+                continue
+            rec = man.entries["opt"].get(os.path.basename(path))
+            if rec and rec.get("hash") == file_hash(path):  # тот же файл, только mtime сменился
+                man.record("opt", path, rec["hash"])
+                skipped += 1
+                continue
+            paths.append(path)
+
+        # сжатие меняет размер/mtime — запись "pdf" обновляем, иначе PDF сочтётся устаревшим
+        pdf_hashes = {p: man.built_hash("pdf", p) for p in paths}
+        total = len(paths)
+        done = saved = 0
+        errors: list[str] = []
+
+        def on_file(path, sizes, err):
+            nonlocal done, saved
+            done += 1
+            if err:
+                errors.append(f"{os.path.basename(path)}: {err}")
+            else:
+                saved += sizes[0] - sizes[1]
+                if pdf_hashes[path] is not None:
+                    man.record("pdf", path, pdf_hashes[path])
+                man.record("opt", path, file_hash(path))
+            message_cb(f"[{done}/{total}] {os.path.basename(path)}")
+            progress_cb(done, total)
+
+        try:
+            optimize_batch(paths, on_file)
+        finally:
+            man.save()
+            self.pdf_inventory.sync()  # файлы те же, папку трогали только временные
+        return {
+            "optimized": total - len(errors), "skipped": skipped, "saved": saved,
+            "errors": len(errors), "error_messages": errors[:5],
+        }
+
     # ---- outlook ----
     def send_test_one(self, sender: str, subject: str, idx: int):
         if not WIN:
@@ -1,56 +1,112 @@
+import re
+
 from docx import Document
+from docx.opc.oxml import serialize_part_xml
+from docx.opc.part import XmlPart
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+
+# части пакета, где Word хранит текст: тело, колонтитулы, сноски, примечания
+STORY_PART_RE = re.compile(r"^/word/(document|header\d*|footer\d*|footnotes|endnotes|comments)\.xml$")
+
+W_P = qn("w:p")
+W_T = qn("w:t")
+
+def iter_story_parts(doc: Document):
+    for part in doc.part.package.iter_parts():
+        if STORY_PART_RE.match(str(part.partname)):
+            yield part
+
+def story_root(part):
+    """
+    Корень XML части. Сноски/концевые сноски python-docx грузит простым Part
+    (одни байты) — их XML разбираем сами; запись обратно — set_story_root().
+    """
+    if isinstance(part, XmlPart):
+        return part.element
+    return parse_xml(part.blob)
+
+def set_story_root(part, root):
+    if isinstance(part, XmlPart):
+        part._element = root
+    else:
+        part._blob = serialize_part_xml(root)
+
+def _has_any(text: str, placeholders) -> bool:
+    return any(ph in text for ph in placeholders)
+
+def iter_placeholder_paragraphs(root, placeholders):
+    """
+    Абзацы части (включая вложенные таблицы и надписи), где есть хоть одна метка.
+    Фильтр — по сырому тексту w:t (lxml, без python-docx), так что абзацы без
+    меток и целые части без меток почти ничего не стоят.
+    """
+    if not _has_any("".join(root.itertext(W_T)), placeholders):
+        return
+    for p in root.iter(W_P):
+        if _has_any("".join(p.itertext(W_T)), placeholders):
+            yield Paragraph(p, None)
 
 def _replace_in_paragraph_runs(paragraph, mapping: dict[str, str]) -> None:
-    if not paragraph.runs:
+    """
+    Замена меток за один проход по run'ам. Метка, разрезанная на несколько
+    run'ов, целиком заменяется в первом из них (с его форматированием),
+    остальные покрытые run'ы очищаются, хвост последнего переезжает в первый.
+    Меняются только run'ы, чей текст действительно изменился.
+    """
+    runs = paragraph.runs
+    if not runs:
+        return
+
+    texts = [r.text or "" for r in runs]
+    full = "".join(texts)
+    phs = [ph for ph in mapping if ph and ph in full]
+    if not phs:
         return
 
-    full = "".join(r.text for r in paragraph.runs)
-    for ph, val in mapping.items():
-        if ph not in full:
+    # все вхождения за один проход: слева направо, без перекрытий
+    pattern = re.compile("|".join(re.escape(ph) for ph in sorted(phs, key=len, reverse=True)))
+    matches = [(m.start(), m.end(), mapping[m.group(0)]) for m in pattern.finditer(full)]
+
+    ends = []
+    pos = 0
+    for t in texts:
+        pos += len(t)
+        ends.append(pos)
+
+    out = [[] for _ in runs]
+    mi = 0
+    i = 0
+    dest = 0   # run, куда сейчас пишется текст (после метки через run'ы — первый из них)
+    p = 0
+    while i < len(runs):
+        if mi < len(matches) and matches[mi][0] < ends[i]:
+            s, e, val = matches[mi]
+            mi += 1
+            out[dest].append(full[p:s])
+            out[dest].append(val)
+            p = e
+            while ends[i] < e:
+                i += 1
             continue
+        out[dest].append(full[p:ends[i]])
+        p = ends[i]
+        i += 1
+        dest = i
 
-        start = 0
-        while True:
-            idx = full.find(ph, start)
-            if idx == -1:
-                break
-            end = idx + len(ph)
-
-            spans = []
-            pos = 0
-            for ri, r in enumerate(paragraph.runs):
-                rt = r.text or ""
-                spans.append((ri, pos, pos + len(rt)))
-                pos += len(rt)
-
-            cover = []
-            for ri, a, b in spans:
-                if b <= idx:
-                    continue
-                if a >= end:
-                    break
-                cover.append((ri, a, b))
-            if not cover:
-                break
-
-            first_ri, first_a, _ = cover[0]
-            last_ri, last_a, _ = cover[-1]
-
-            prefix = paragraph.runs[first_ri].text[: max(0, idx - first_a)]
-            suffix = paragraph.runs[last_ri].text[max(0, end - last_a):]
-
-            paragraph.runs[first_ri].text = prefix + val + suffix
-            for ri, _, _ in cover[1:]:
-                paragraph.runs[ri].text = ""
-
-            full = "".join(r.text for r in paragraph.runs)
-            start = idx + len(val)
+    for r, old, parts in zip(runs, texts, out):
+        new = "".join(parts)
+        if new != old:
+            r.text = new
 
 def replace_placeholders_docx(doc: Document, mapping: dict[str, str]) -> None:
-    for p in doc.paragraphs:
-        _replace_in_paragraph_runs(p, mapping)
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for p in cell.paragraphs:
-                    _replace_in_paragraph_runs(p, mapping)
\ No newline at end of file
+    """Все части с текстом: тело, таблицы (в т.ч. вложенные), надписи, колонтитулы, сноски, примечания."""
+    for part in iter_story_parts(doc):
+        root = story_root(part)
+        changed = False
+        for p in iter_placeholder_paragraphs(root, mapping):
+            _replace_in_paragraph_runs(p, mapping)
+            changed = True
+        if changed and not isinstance(part, XmlPart):
+            set_story_root(part, root)
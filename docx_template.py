@@ -0,0 +1,153 @@
+import copy
+import math
+import multiprocessing as mp
+import queue
+from concurrent.futures import ProcessPoolExecutor
+
+from docx import Document
+from docx.opc.oxml import serialize_part_xml
+from docx.text.run import Run
+
+from config import DOCX_ZIP_COPY
+from docx_render import (
+    iter_story_parts, iter_placeholder_paragraphs, story_root, set_story_root, _replace_in_paragraph_runs,
+)
+from docx_zip import ZipTemplateWriter
+
+PLACEHOLDERS = ("<<OBRASHENIE>>", "<<TEXT>>")
+
+def _path_from(root, el) -> tuple[int, ...]:
+    path = []
+    while el is not root:
+        parent = el.getparent()
+        path.append(parent.index(el))
+        el = parent
+    return tuple(reversed(path))
+
+def _walk(root, path: tuple[int, ...]):
+    el = root
+    for i in path:
+        el = el[i]
+    return el
+
+class CompiledTemplate:
+    """
+    Шаблон DOCX, разобранный один раз на всю пачку открыток.
+    При компиляции метки, разрезанные Word'ом на несколько run'ов, склеиваются
+    в один run, и запоминаются пути к этим run'ам («слоты»). Для строки
+    копируется готовое XML-дерево части и заполняются только слоты —
+    zip, XML и обход абзацев шаблона не повторяются.
+
+    zip_copy=True: файл пишется на уровне zip — заново сжимаются только части
+    с метками, картинки/шрифты копируются из шаблона сжатыми байтами.
+    """
+    def __init__(self, path: str, placeholders=PLACEHOLDERS, zip_copy: bool = DOCX_ZIP_COPY):
+        self.path = path
+        self.placeholders = tuple(placeholders)
+        self.doc = Document(path)
+        # [(part, эталонный корень XML, [путь к run со слотом, ...]), ...]
+        self.parts = []
+        for part in iter_story_parts(self.doc):
+            root = story_root(part)
+            slots = self._compile_part(root)
+            if slots:
+                self.parts.append((part, root, slots))
+
+        self.zip_writer = None
+        if zip_copy:
+            try:
+                self.zip_writer = ZipTemplateWriter(path, [str(p.partname).lstrip("/") for p, _m, _s in self.parts])
+            except Exception:
+                self.zip_writer = None  # нестандартный zip — сохраняем через python-docx
+
+    def _compile_part(self, root) -> list[tuple[int, ...]]:
+        keep = {ph: ph for ph in self.placeholders}
+        slots = []
+        for para in iter_placeholder_paragraphs(root, self.placeholders):
+            _replace_in_paragraph_runs(para, keep)  # метка целиком переезжает в первый run
+            for r in para.runs:
+                if any(ph in r.text for ph in self.placeholders):
+                    slots.append(_path_from(root, r._r))
+        return slots
+
+    def fill(self, mapping: dict[str, str]) -> list:
+        """Новые корни XML частей со слотами (в том же порядке, что self.parts)."""
+        roots = []
+        for _part, master, slots in self.parts:
+            root = copy.deepcopy(master)
+            for path in slots:
+                run = Run(_walk(root, path), None)
+                text = run.text
+                for ph, val in mapping.items():
+                    if ph in text:
+                        text = text.replace(ph, val)
+                run.text = text
+            roots.append(root)
+        return roots
+
+    def save(self, out_path: str, mapping: dict[str, str]) -> None:
+        roots = self.fill(mapping)
+        if self.zip_writer is not None:
+            self.zip_writer.write(out_path, {
+                str(part.partname).lstrip("/"): serialize_part_xml(root)
+                for (part, _master, _slots), root in zip(self.parts, roots)
+            })
+            return
+        try:
+            for (part, _master, _slots), root in zip(self.parts, roots):
+                set_story_root(part, root)
+            self.doc.save(out_path)
+        finally:
+            for part, master, _slots in self.parts:
+                set_story_root(part, master)
+
+# ---- параллельная сборка (процессы) ----
+# В каждом процессе шаблон компилируется один раз (initializer), строки идут
+# пачками; о каждой готовой строке процесс сразу сообщает в общую очередь.
+
+_worker_tpl: CompiledTemplate | None = None
+_worker_q = None
+
+def _init_worker(template_path: str, q, zip_copy: bool):
+    global _worker_tpl, _worker_q
+    _worker_tpl = CompiledTemplate(template_path, zip_copy=zip_copy)
+    _worker_q = q
+
+def _render_shard(tasks: list) -> int:
+    for key, out_path, mapping in tasks:
+        try:
+            _worker_tpl.save(out_path, mapping)
+            _worker_q.put((key, None))
+        except Exception as e:
+            _worker_q.put((key, f"{type(e).__name__}: {e}"))
+    return len(tasks)
+
+def render_parallel(template_path: str, tasks: list, processes: int, on_row, zip_copy: bool = DOCX_ZIP_COPY) -> None:
+    """
+    tasks = [(key, out_path, mapping), ...]; пути вычисляет вызывающий (они детерминированы).
+    on_row(key, error | None) вызывается в текущем потоке по мере готовности каждой строки.
+    """
+    if not tasks:
+        return
+    processes = max(1, min(int(processes), len(tasks)))
+    chunk = max(1, min(32, math.ceil(len(tasks) / (processes * 4))))
+    shards = [tasks[i:i + chunk] for i in range(0, len(tasks), chunk)]
+
+    ctx = mp.get_context()
+    q = ctx.Queue()
+    with ProcessPoolExecutor(
+        max_workers=processes, mp_context=ctx, initializer=_init_worker, initargs=(template_path, q, zip_copy)
+    ) as pool:
+        futures = [pool.submit(_render_shard, shard) for shard in shards]
+        left = len(tasks)
+        while left:
+            try:
+                key, err = q.get(timeout=0.2)
+            except queue.Empty:
+                if all(f.done() for f in futures) and q.empty():
+                    break  # процессы умерли (BrokenProcessPool) — ошибка всплывёт ниже
+                continue
+            left -= 1
+            on_row(key, err)
+        for f in futures:
+            f.result()
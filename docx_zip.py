@@ -0,0 +1,87 @@
+import struct
+import zipfile
+import zlib
+
+_LOCAL = struct.Struct("<4s5H3L2H")        # local file header
+_CENTRAL = struct.Struct("<4s6H3L5H2L")    # central directory file header
+_EOCD = struct.Struct("<4s4H2LH")          # end of central directory
+
+_FLAG_DATA_DESCRIPTOR = 0x08
+
+def _dos_datetime(dt) -> tuple[int, int]:
+    y, mo, d, h, mi, s = dt
+    return ((y - 1980) << 9) | (mo << 5) | d, (h << 11) | (mi << 5) | (s // 2)
+
+class ZipTemplateWriter:
+    """
+    Пишет DOCX как zip: заменённые части (document.xml, колонтитулы с метками)
+    сжимаются заново, все остальные члены архива (картинки, шрифты, стили)
+    копируются из шаблона как есть — уже сжатыми байтами, без распаковки.
+    Zip64 и шифрование не поддерживаются — тогда ValueError, и вызывающий
+    сохраняет через python-docx.
+    """
+    def __init__(self, template_path: str, replaced_names):
+        self.replaced = set(replaced_names)
+        self.members = []   # [(name, заголовочные поля, raw-байты | None)]
+        with open(template_path, "rb") as f, zipfile.ZipFile(f) as zf:
+            infos = zf.infolist()
+            if len(infos) >= 0xFFFF:
+                raise ValueError("zip64 не поддерживается")
+            names = {i.filename for i in infos}
+            missing = self.replaced - names
+            if missing:
+                raise ValueError(f"в шаблоне нет частей: {sorted(missing)}")
+
+            for info in infos:
+                if info.flag_bits & 0x01:
+                    raise ValueError("зашифрованный zip")
+                if max(info.compress_size, info.file_size, info.header_offset) >= 0xFFFFFFFF:
+                    raise ValueError("zip64 не поддерживается")
+                name = info.filename.encode("utf-8" if info.flag_bits & 0x800 else "cp437")
+                date, time_ = _dos_datetime(info.date_time)
+                meta = {
+                    "version": (info.create_system << 8) | info.create_version, "extract": info.extract_version,
+                    "flags": info.flag_bits & ~_FLAG_DATA_DESCRIPTOR,
+                    "method": info.compress_type, "date": date, "time": time_,
+                    "crc": info.CRC, "csize": info.compress_size, "usize": info.file_size,
+                    "ext_attr": info.external_attr, "int_attr": info.internal_attr,
+                }
+                raw = None
+                if info.filename not in self.replaced:
+                    f.seek(info.header_offset)
+                    head = _LOCAL.unpack(f.read(_LOCAL.size))
+                    f.seek(info.header_offset + _LOCAL.size + head[9] + head[10])
+                    raw = f.read(info.compress_size)
+                self.members.append((info.filename, name, meta, raw))
+
+    def write(self, out_path: str, replacements: dict[str, bytes]) -> None:
+        central = []
+        with open(out_path, "wb") as f:
+            for filename, name, meta, raw in self.members:
+                if raw is None:
+                    data = replacements[filename]
+                    comp = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+                    raw = comp.compress(data) + comp.flush()
+                    meta = dict(
+                        meta, method=zipfile.ZIP_DEFLATED, extract=max(meta["extract"], 20),
+                        crc=zlib.crc32(data), csize=len(raw), usize=len(data),
+                    )
+                offset = f.tell()
+                f.write(_LOCAL.pack(
+                    b"PK\x03\x04", meta["extract"], meta["flags"], meta["method"], meta["time"], meta["date"],
+                    meta["crc"], meta["csize"], meta["usize"], len(name), 0,
+                ))
+                f.write(name)
+                f.write(raw)
+                central.append(_CENTRAL.pack(
+                    b"PK\x01\x02", meta["version"], meta["extract"], meta["flags"], meta["method"],
+                    meta["time"], meta["date"], meta["crc"], meta["csize"], meta["usize"],
+                    len(name), 0, 0, 0, meta["int_attr"], meta["ext_attr"], offset,
+                ) + name)
+
+            cd_offset = f.tell()
+            cd = b"".join(central)
+            f.write(cd)
+            if cd_offset >= 0xFFFFFFFF:
+                raise ValueError("zip64 не поддерживается")
+            f.write(_EOCD.pack(b"PK\x05\x06", 0, 0, len(central), len(central), len(cd), cd_offset, 0))
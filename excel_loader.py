@@ -0,0 +1,127 @@
+import json
+import os
+
+import pandas as pd
+
+from config import EXCEL_CACHE_DIR, EXCEL_CACHE_KEEP
+from manifest import file_hash
+from model import EXCEL_COLUMNS
+from utils import norm_str
+
+try:
+    import python_calamine  # noqa: F401  (движок pandas "calamine", на Rust)
+except Exception:
+    python_calamine = None
+
+# движок "calamine" есть в pandas начиная с 2.2
+_HAS_CALAMINE = python_calamine is not None and tuple(int(x) for x in pd.__version__.split(".")[:2]) >= (2, 2)
+
+try:
+    import pyarrow  # noqa: F401  (Feather)
+except Exception:
+    pyarrow = None
+
+# меняется вместе с ensure_columns/apply_auto_gender — старый кэш тогда не подходит
+_CACHE_FORMAT = 1
+_INDEX_NAME = "index.json"
+
+def read_excel_fast(path: str) -> pd.DataFrame:
+    """
+    Первый лист Excel: только колонки из EXCEL_COLUMNS, текст — строками.
+    Движок calamine, если установлен python-calamine (и pandas >= 2.2),
+    иначе обычный (openpyxl/xlrd) — такой же медленный, как раньше.
+    """
+    engine = "calamine" if _HAS_CALAMINE else None
+    with pd.ExcelFile(path, engine=engine) as book:  # книга открывается один раз
+        header = book.parse(0, nrows=0).columns
+        usecols = [c for c in header if norm_str(c) in EXCEL_COLUMNS]
+        # "Отправлять" — как есть: TRUE/FALSE из Excel строкой стали бы "False" → True
+        dtype = {c: str for c in usecols if norm_str(c) != "Отправлять"}
+        return book.parse(0, usecols=usecols, dtype=dtype)
+
+def _ext() -> str:
+    # pickle читается только той же версией pandas — она в имени файла
+    return ".feather" if pyarrow is not None else f"_pd{pd.__version__}.pkl"
+
+def _cache_path(sha: str) -> str:
+    return os.path.join(EXCEL_CACHE_DIR, f"{sha}_v{_CACHE_FORMAT}{_ext()}")
+
+def _load_index() -> dict:
+    try:
+        with open(os.path.join(EXCEL_CACHE_DIR, _INDEX_NAME), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _save_index(index: dict):
+    path = os.path.join(EXCEL_CACHE_DIR, _INDEX_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def content_key(path: str) -> str:
+    """sha256 книги; если размер и mtime те же, что в прошлый раз, — без чтения файла."""
+    st = os.stat(path)
+    rec = _load_index().get(os.path.abspath(path))
+    if rec and rec.get("size") == st.st_size and rec.get("mtime_ns") == st.st_mtime_ns and rec.get("sha256"):
+        return rec["sha256"]
+    return file_hash(path)
+
+def load_cached(path: str) -> tuple[pd.DataFrame | None, str]:
+    """(нормализованная таблица из кэша | None, хэш книги)."""
+    sha = content_key(path)
+    cache = _cache_path(sha)
+    if not os.path.exists(cache):
+        return None, sha
+    try:
+        df = pd.read_feather(cache) if cache.endswith(".feather") else pd.read_pickle(cache)
+    except Exception:
+        return None, sha  # битый кэш — прочитаем Excel заново
+    try:
+        os.utime(cache)  # для _prune: недавно открытые живут дольше
+    except OSError:
+        pass
+    _remember(path, sha)
+    return df, sha
+
+def save_cached(path: str, sha: str, df: pd.DataFrame):
+    """Положить нормализованную таблицу в кэш (ошибки записи не мешают работе)."""
+    try:
+        os.makedirs(EXCEL_CACHE_DIR, exist_ok=True)
+        cache = _cache_path(sha)
+        tmp = cache + ".tmp"
+        if cache.endswith(".feather"):
+            df.reset_index(drop=True).to_feather(tmp)
+        else:
+            df.to_pickle(tmp)
+        os.replace(tmp, cache)
+        _remember(path, sha)
+        _prune()
+    except Exception:
+        pass
+
+def _remember(path: str, sha: str):
+    try:
+        st = os.stat(path)
+        index = _load_index()
+        rec = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha}
+        if index.get(os.path.abspath(path)) != rec:
+            index[os.path.abspath(path)] = rec
+            _save_index(index)
+    except OSError:
+        pass
+
+def _prune():
+    """Оставить EXCEL_CACHE_KEEP последних таблиц."""
+    files = [
+        os.path.join(EXCEL_CACHE_DIR, f) for f in os.listdir(EXCEL_CACHE_DIR)
+        if f.endswith((".feather", ".pkl"))
+    ]
+    files.sort(key=os.path.getmtime, reverse=True)
+    for f in files[EXCEL_CACHE_KEEP:]:
+        try:
+            os.remove(f)
+        except OSError:
+            pass
@@ -0,0 +1,118 @@
+from itertools import permutations
+
+from utils import fio_key
+
+def _canon(fio: str) -> str:
+    # порядок слов не важен: "Иван Иванов" == "Иванов Иван"
+    return " ".join(sorted(fio_key(fio).split()))
+
+def same_fio(a: str, b: str) -> bool:
+    """Одно и то же ФИО с точностью до регистра, Ё/Е и порядка слов."""
+    ca = _canon(a)
+    return bool(ca) and ca == _canon(b)
+
+def _trigrams(s: str) -> set[str]:
+    s = f"  {s} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+def _edit_distance(a: str, b: str) -> int:
+    """Дамерау-Левенштейн (OSA): перестановка соседних букв — одна опечатка."""
+    d = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i][0] = i
+    for j in range(len(b) + 1):
+        d[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[-1][-1]
+
+def _close_enough(q_words: list[str], c_words: list[str], per_word: int = 1, total: int = 2) -> bool:
+    """Слова попарно (в любом порядке) отличаются не больше чем на одну опечатку."""
+    if len(q_words) != len(c_words) or len(q_words) > 5:
+        return False
+    for perm in permutations(c_words):
+        dists = [_edit_distance(a, b) for a, b in zip(q_words, perm)]
+        if max(dists) <= per_word and sum(dists) <= total:
+            return True
+    return False
+
+class FioIndex:
+    """
+    Локальный индекс ФИО → URL Tatcenter из уже найденных людей (кэш).
+    best() — то же ФИО с другим порядком слов (регистр и Ё/Е сводит fio_key):
+    ответ без сети. candidates() — похожие ФИО (триграммы, коэффициент Дайса,
+    не больше одной опечатки на слово): это только догадка. Ильдар/Ильнар,
+    Рустамовна/Рустемовна — разные люди, поэтому кандидата принимают, лишь
+    когда ФИО на его странице совпало с искомым (tatcenter.lookup_person).
+    """
+    def __init__(self):
+        self._entries: list[tuple[str, str]] = []   # (fio, url)
+        self._grams: list[set[str]] = []
+        self._postings: dict[str, list[int]] = {}
+        self._urls: dict[str, set[str]] = {}        # канон ФИО -> URL
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, fio: str, url: str):
+        canon = _canon(fio)
+        if not canon or not url or url in self._urls.get(canon, ()):
+            return
+        self._urls.setdefault(canon, set()).add(url)
+        grams = _trigrams(canon)
+        eid = len(self._entries)
+        self._entries.append((fio, url))
+        self._grams.append(grams)
+        for g in grams:
+            self._postings.setdefault(g, []).append(eid)
+
+    def lookup(self, fio: str, limit: int = 5, min_score: float = 0.0) -> list[tuple[float, str, str]]:
+        """Кандидаты [(score 0..1, fio, url)] по убыванию похожести."""
+        canon = _canon(fio)
+        if not canon:
+            return []
+        grams = _trigrams(canon)
+
+        # префиксный фильтр: при Dice >= s у кандидата не меньше need общих триграмм,
+        # значит он обязательно встретится среди (len - need + 1) самых редких
+        probe = sorted(grams, key=lambda g: len(self._postings.get(g, ())))
+        if min_score > 0:
+            need = max(1, int(min_score * len(grams) / (2 - min_score)))
+            probe = probe[: len(grams) - need + 1]
+        cand: set[int] = set()
+        for g in probe:
+            cand.update(self._postings.get(g, ()))
+
+        scored = []
+        for eid in cand:
+            other = self._grams[eid]
+            sc = 2.0 * len(grams & other) / (len(grams) + len(other))
+            if sc >= min_score:
+                scored.append((sc, eid))
+        scored.sort(reverse=True)
+        return [(round(sc, 4), self._entries[eid][0], self._entries[eid][1]) for sc, eid in scored[:limit]]
+
+    def best(self, fio: str) -> str | None:
+        """URL, если ФИО совпадает с точностью до регистра, Ё/Е и порядка слов и человек один; иначе None."""
+        urls = self._urls.get(_canon(fio))
+        return next(iter(urls)) if urls and len(urls) == 1 else None
+
+    def candidates(self, fio: str, limit: int = 3, min_score: float = 0.6) -> list[str]:
+        """URL похожих ФИО (не больше одной опечатки на слово), лучшие первыми. Требуют проверки по странице."""
+        q_words = _canon(fio).split()
+        out = []
+        for _score, cand, url in self.lookup(fio, limit=10, min_score=min_score):
+            if url not in out and _close_enough(q_words, _canon(cand).split()):
+                out.append(url)
+        return out[:limit]
+
+    @classmethod
+    def from_pairs(cls, pairs) -> "FioIndex":
+        index = cls()
+        for fio, url in pairs:
+            index.add(fio, url)
+        return index
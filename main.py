@@ -1,3 +1,5 @@
+import multiprocessing
+
 from ui import PostcardApp
 
 def main():
@@ -5,4 +7,6 @@ def main():
     app.mainloop()
 
 if __name__ == "__main__":
+    # сборка DOCX в процессах: без этого exe из PyInstaller плодит копии окна
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = "manifest.json"
+
+_file_hashes: dict[tuple, str] = {}
+
+def file_hash(path: str) -> str:
+    """sha256 файла; повторно файл читается, только если изменились размер/mtime."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    h = _file_hashes.get(key)
+    if h is None:
+        d = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                d.update(chunk)
+        h = _file_hashes[key] = d.hexdigest()
+    return h
+
+def row_hash(template_hash: str, common_text: str, obrashenie: str, filename: str) -> str:
+    """Хэш всего, от чего зависит открытка строки."""
+    d = hashlib.sha256()
+    for part in (template_hash, common_text, obrashenie, filename):
+        d.update(part.encode("utf-8"))
+        d.update(b"\x00")
+    return d.hexdigest()
+
+def _file_sig(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+class BuildManifest:
+    """
+    RESULT/manifest.json: для каждого собранного файла (DOCX/PDF) — хэш входных
+    данных строки и размер/mtime файла. Строка пересобирается, только если хэш
+    поменялся или файл удалили/изменили руками.
+    PDF помнит хэш DOCX, из которого он сделан; "opt" — хэш уже сжатого PDF.
+    """
+    KINDS = ("docx", "pdf", "opt")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: dict[str, dict] = {k: {} for k in self.KINDS}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for k in self.KINDS:
+                if isinstance(data.get(k), dict):
+                    self.entries[k] = data[k]
+        except (OSError, ValueError, AttributeError):
+            pass  # нет/битый манифест — просто соберём всё заново
+
+    def built_hash(self, kind: str, out_path: str) -> str | None:
+        """Хэш, с которым собран out_path; None — файла нет или он изменён."""
+        rec = self.entries[kind].get(os.path.basename(out_path))
+        if not rec or _file_sig(out_path) != rec.get("sig"):
+            return None
+        return rec.get("hash")
+
+    def is_fresh(self, kind: str, out_path: str, h: str) -> bool:
+        return self.built_hash(kind, out_path) == h
+
+    def record(self, kind: str, out_path: str, h: str):
+        self.entries[kind][os.path.basename(out_path)] = {"hash": h, "sig": _file_sig(out_path)}
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
@@ -1,8 +1,63 @@
 from dataclasses import dataclass
 import os
+import numpy as np
 import pandas as pd
 
 from utils import norm_str, is_email_like, sanitize_filename, detect_gender_by_patronymic
+from search_index import SearchIndex
+
+# is_email_like() одним регулярным выражением: одна "@", непустая локальная часть,
+# в домене есть точка, нет пробелов и , ; ( ) : < >
+_EMAIL_LIKE_RE = r"[^@ ,;():<>]+@[^@ ,;():<>]*\.[^@ ,;():<>]*"
+
+STATUS_OK = "ОК"
+CHANGE_LOG_SIZE = 256  # сколько последних правок помнит changed_since()
+
+# колонки, с которыми работает приложение (остальные из Excel не читаются)
+TEXT_COLUMNS = [
+    "Фамилия", "Имя", "Отчество", "E-mail", "Пол (итог)", "Пол (авто)",
+    "E-mail_Татцентр", "URL Tatcenter", "Дата рождения (Татцентр)",
+]
+EXCEL_COLUMNS = TEXT_COLUMNS + ["Отправлять"]
+
+def _norm_ws(s: pd.Series) -> pd.Series:
+    """Пробельная часть norm_str() по всей колонке (Ё для проверок статуса не важна)."""
+    return (
+        s.astype(str)
+        .str.replace("\u00A0", " ", regex=False)
+        .str.strip()
+        .str.replace(r"\s+", " ", regex=True)
+    )
+
+def norm_column(s: pd.Series) -> pd.Series:
+    """norm_str() для всей колонки: каждое различное значение нормализуется один раз."""
+    # только строки (+ пропуски): factorize не склеит 1, 1.0 и True, у которых разный str().
+    # pandas 2.x читает текст в object — такие колонки тоже сюда
+    if isinstance(s.dtype, pd.StringDtype) or pd.api.types.infer_dtype(s, skipna=True) == "string":
+        codes, uniq = pd.factorize(s)
+        vals = np.array([norm_str(v) for v in uniq] + [""], dtype=object)[codes]
+        na = codes < 0
+        if na.any():
+            # None → "", NaN → "nan": пропуски разного вида нормализуются каждый сам по себе
+            vals[na] = [norm_str(v) for v in s.to_numpy(dtype=object)[na]]
+    else:
+        vals = [norm_str(v) for v in s.tolist()]
+    return pd.Series(vals, index=s.index, name=s.name, dtype=str)
+
+def email_like_mask(s: pd.Series) -> pd.Series:
+    """is_email_like(norm_str(x)) для всей колонки сразу."""
+    return _norm_ws(s).str.fullmatch(_EMAIL_LIKE_RE).fillna(False).astype(bool)
+
+def status_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Производные колонки статуса (как compute_status_row), векторно."""
+    g_ok = _norm_ws(df["Пол (итог)"]).isin(["Муж", "Жен"]).to_numpy()
+    e_ok = email_like_mask(df["E-mail"]).to_numpy()
+    status = np.select(
+        [g_ok & e_ok, ~g_ok & ~e_ok, ~g_ok],
+        [STATUS_OK, "Проблема: нет пола, e-mail пуст/битый", "Проблема: нет пола"],
+        default="Проблема: e-mail пуст/битый",
+    )
+    return pd.DataFrame({"gender_ok": g_ok, "email_ok": e_ok, "status": status}, index=df.index)
 
 @dataclass
 class AppState:
@@ -20,6 +75,11 @@ class DataModel:
     def __init__(self):
         self.state = AppState()
         self.df: pd.DataFrame | None = None
+        # gender_ok / email_ok / status по строкам df; обновляет refresh_status()
+        self.status: pd.DataFrame | None = None
+        self.search_index: SearchIndex | None = None
+        self.data_version = 0  # растёт при любой правке данных (ключ кэшей)
+        self._changes: list[tuple[int, list | None]] = []  # (версия, idx строк | None — весь df)
 
     # ---- columns ----
     def ensure_columns(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -43,11 +103,8 @@ class DataModel:
         if "Отправлять" not in df.columns:
             df["Отправлять"] = True
 
-        for c in [
-            "Фамилия", "Имя", "Отчество", "E-mail", "Пол (итог)", "Пол (авто)",
-            "E-mail_Татцентр", "URL Tatcenter", "Дата рождения (Татцентр)"
-        ]:
-            df[c] = df[c].apply(norm_str)
+        for c in TEXT_COLUMNS:
+            df[c] = norm_column(df[c])
 
         df["Отправлять"] = df["Отправлять"].fillna(True).astype(bool)
         return df
@@ -58,6 +115,7 @@ class DataModel:
         self.df["Пол (авто)"] = self.df["Отчество"].apply(detect_gender_by_patronymic)
         mask = self.df["Пол (итог)"].eq("") & self.df["Пол (авто)"].ne("")
         self.df.loc[mask, "Пол (итог)"] = self.df.loc[mask, "Пол (авто)"]
+        self.rows_changed()
 
     # ---- status ----
     def compute_status_row(self, row: pd.Series) -> tuple[bool, bool, str]:
@@ -72,6 +130,82 @@ class DataModel:
             return True, True, "ОК"
         return g_ok, e_ok, "Проблема: " + ", ".join(parts)
 
+    def refresh_status(self, idxs=None):
+        """Пересчитать колонки статуса: все строки или только idxs (после правок)."""
+        if self.df is None:
+            self.status = None
+            return
+        if idxs is None or self.status is None or not self.status.index.equals(self.df.index):
+            self.status = status_frame(self.df)
+            return
+        idxs = list(idxs)
+        if idxs:
+            self.status.loc[idxs] = status_frame(self.df.loc[idxs])
+
+    def rows_changed(self, idxs=None):
+        """Строки df изменились (None — весь df): статус и поисковый индекс."""
+        self.data_version += 1
+        self._changes.append((self.data_version, None if idxs is None else list(idxs)))
+        del self._changes[:-CHANGE_LOG_SIZE]
+        self.refresh_status(idxs)
+        if idxs is None or self.search_index is None:
+            self.search_index = None  # соберётся при первом поиске
+            return
+        for idx in idxs:
+            self.search_index.update(idx, self.df.loc[idx])
+
+    def changed_since(self, version: int) -> set | None:
+        """idx строк, изменённых после data_version == version; None — менялось всё (или не помним)."""
+        if version == self.data_version:
+            return set()
+        if not self._changes or self._changes[0][0] > version + 1:
+            return None
+        out = set()
+        for v, idxs in self._changes:
+            if v > version:
+                if idxs is None:
+                    return None
+                out.update(idxs)
+        return out
+
+    def set_cell(self, idx, col: str, value):
+        """Правка одной ячейки; статус и поиск по строке обновляются сразу."""
+        self.df.at[idx, col] = value
+        if col != "Отправлять":  # галочка не влияет ни на статус, ни на открытку
+            self.rows_changed([idx])
+
+    def search_rows(self, query: str) -> set | None:
+        """idx строк под запрос поиска; None — запрос пустой."""
+        if self.df is None:
+            return None
+        if self.search_index is None:
+            self.search_index = SearchIndex()
+            self.search_index.build(self.df)
+        return self.search_index.search(query)
+
+    def status_of(self, idx) -> tuple[bool, bool, str]:
+        if self.status is None:
+            self.refresh_status()
+        r = self.status.loc[idx]
+        return bool(r["gender_ok"]), bool(r["email_ok"]), r["status"]
+
+    def status_counts(self) -> dict:
+        """Итоги для строки состояния: всего, без пола, с плохим e-mail, проблемных."""
+        if self.status is None:
+            self.refresh_status()
+        st = self.status
+        return {
+            "total": len(st),
+            "no_gender": int((~st["gender_ok"]).sum()),
+            "bad_email": int((~st["email_ok"]).sum()),
+            "problems": int((st["status"] != STATUS_OK).sum()),
+        }
+
+    # ---- template ----
+    def template_is_pdf(self) -> bool:
+        """PDF-шаблон: открытки собираются сразу в PDF, без DOCX и Word."""
+        return self.state.template_path.lower().endswith(".pdf")
+
     # ---- result dirs ----
     def ensure_result_dirs(self):
         if not self.state.project_dir:
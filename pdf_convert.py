@@ -0,0 +1,327 @@
+import multiprocessing as mp
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from config import WIN, PDF_BACKEND, PDF_WORKERS, PDF_TIMEOUT, PDF_RECYCLE_AFTER
+
+# ---- конвертеры (бэкенды) ----
+# Один экземпляр бэкенда живёт в одном процессе-работнике:
+# open() → convert() × N → close(). helper_pids() — внешние процессы
+# (WINWORD.EXE и т.п.), которые надо добить, если работник завис.
+
+class WordBackend:
+    """Microsoft Word через COM (только Windows + pywin32)."""
+    name = "word"
+
+    def __init__(self, timeout: float = PDF_TIMEOUT):
+        self.word = None
+        self.pid = None
+
+    @staticmethod
+    def available() -> bool:
+        from win_word_pdf import win32com
+        return WIN and win32com is not None
+
+    def open(self):
+        from win_word_pdf import word_open, word_pid
+        self.word = word_open()
+        self.pid = word_pid(self.word)
+
+    def helper_pids(self) -> list[int]:
+        return [self.pid] if self.pid else []
+
+    def convert(self, docx: str, pdf: str):
+        from win_word_pdf import word_export_one
+        word_export_one(self.word, docx, pdf)
+
+    def close(self):
+        if self.word is not None:
+            try:
+                self.word.Quit()
+            except Exception:
+                pass
+            self.word = None
+
+def _soffice_path() -> str | None:
+    found = shutil.which("soffice") or shutil.which("libreoffice")
+    if found:
+        return found
+    if WIN:
+        for base in (os.environ.get("ProgramFiles", ""), os.environ.get("ProgramFiles(x86)", "")):
+            p = os.path.join(base, "LibreOffice", "program", "soffice.exe")
+            if base and os.path.exists(p):
+                return p
+    return None
+
+class LibreOfficeBackend:
+    """LibreOffice без окна; у каждого работника свой профиль, иначе экземпляры мешают друг другу."""
+    name = "libreoffice"
+
+    def __init__(self, timeout: float = PDF_TIMEOUT):
+        self.timeout = timeout
+        self.exe = None
+        self.profile = None
+        self.outdir = None
+
+    @staticmethod
+    def available() -> bool:
+        return _soffice_path() is not None
+
+    def open(self):
+        self.exe = _soffice_path()
+        if not self.exe:
+            raise RuntimeError("LibreOffice (soffice) не найден.")
+        self.profile = tempfile.mkdtemp(prefix="postcard_lo_")
+        self.outdir = tempfile.mkdtemp(prefix="postcard_lo_out_")
+
+    def helper_pids(self) -> list[int]:
+        return []  # soffice запускается на каждый документ и сам ограничен таймаутом
+
+    def convert(self, docx: str, pdf: str):
+        cmd = [
+            self.exe, f"-env:UserInstallation={Path(self.profile).as_uri()}",
+            "--headless", "--norestore", "--nologo",
+            "--convert-to", "pdf", "--outdir", self.outdir, os.path.abspath(docx),
+        ]
+        try:
+            # чуть меньше общего таймаута: пусть soffice прибьёт сам работник, а не пул
+            res = subprocess.run(cmd, capture_output=True, timeout=max(5.0, self.timeout - 5.0))
+        except subprocess.TimeoutExpired:
+            raise RuntimeError("LibreOffice не уложился в таймаут")
+        out = os.path.join(self.outdir, Path(docx).stem + ".pdf")
+        if not os.path.exists(out):
+            err = (res.stderr or res.stdout or b"").decode("utf-8", "replace").strip()
+            raise RuntimeError(f"LibreOffice не создал PDF (код {res.returncode}) {err[:200]}".strip())
+        shutil.move(out, pdf)
+
+    def close(self):
+        for d in (self.profile, self.outdir):
+            if d:
+                shutil.rmtree(d, ignore_errors=True)
+
+class StubBackend:
+    """Заглушка для проверки без Word/LibreOffice: PDF с текстом абзацев DOCX."""
+    name = "stub"
+
+    def __init__(self, timeout: float = PDF_TIMEOUT):
+        pass
+
+    @staticmethod
+    def available() -> bool:
+        return True
+
+    def open(self):
+        pass
+
+    def helper_pids(self) -> list[int]:
+        return []
+
+    def convert(self, docx: str, pdf: str):
+        import fitz
+        from docx import Document
+        text = "\n".join(p.text for p in Document(docx).paragraphs)
+        doc = fitz.open()
+        try:
+            page = doc.new_page()
+            tw = fitz.TextWriter(page.rect)
+            tw.fill_textbox(page.rect + (50, 50, -50, -50), text, font=fitz.Font("tiro"), fontsize=11)
+            tw.write_text(page)
+            doc.save(pdf)
+        finally:
+            doc.close()
+
+    def close(self):
+        pass
+
+BACKENDS = {b.name: b for b in (WordBackend, LibreOfficeBackend, StubBackend)}
+
+def pick_backend(name: str = PDF_BACKEND) -> str | None:
+    """Имя бэкенда: заданный в настройках или первый доступный (Word, затем LibreOffice)."""
+    if name:
+        cls = BACKENDS.get(name)
+        return name if (cls is not None and cls.available()) else None
+    for cls in (WordBackend, LibreOfficeBackend):
+        if cls.available():
+            return cls.name
+    return None
+
+# ---- пул процессов-работников ----
+
+def _worker_main(wid: int, backend_name: str, timeout: float, inbox, outbox):
+    backend = BACKENDS[backend_name](timeout=timeout)
+    try:
+        backend.open()
+    except Exception as e:
+        outbox.put(("dead", wid, None, str(e) or e.__class__.__name__))
+        return
+    outbox.put(("ready", wid, None, backend.helper_pids()))
+    try:
+        while True:
+            job = inbox.get()
+            if job is None:
+                break
+            key, src, dst = job
+            try:
+                backend.convert(src, dst)
+                err = None
+            except Exception as e:
+                err = str(e) or e.__class__.__name__
+            outbox.put(("done", wid, key, err))
+    finally:
+        backend.close()
+
+def _kill_pid(pid: int):
+    try:
+        if WIN:
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(pid)], capture_output=True, timeout=15)
+        else:
+            os.kill(pid, signal.SIGKILL)
+    except Exception:
+        pass
+
+class _Worker:
+    def __init__(self, ctx, wid: int, backend_name: str, timeout: float, outbox):
+        self.wid = wid
+        self.inbox = ctx.Queue(maxsize=1)
+        self.proc = ctx.Process(
+            target=_worker_main, args=(wid, backend_name, timeout, self.inbox, outbox), daemon=True
+        )
+        self.proc.start()
+        self.spawned = time.monotonic()
+        self.ready = False
+        self.helper_pids: list[int] = []
+        self.job = None       # (key, src, dst) в работе
+        self.started = 0.0
+        self.done = 0
+
+    def give(self, job):
+        self.job = job
+        self.started = time.monotonic()
+        self.inbox.put(job)
+
+    def stop(self):
+        try:
+            self.inbox.put_nowait(None)
+        except Exception:
+            pass
+
+    def kill(self):
+        if self.proc.is_alive():
+            self.proc.kill()
+        self.proc.join(5)
+        for pid in self.helper_pids:
+            _kill_pid(pid)
+
+def convert_batch(
+    jobs,
+    on_doc,
+    backend_name: str,
+    workers: int = PDF_WORKERS,
+    timeout: float = PDF_TIMEOUT,
+    recycle_after: int = PDF_RECYCLE_AFTER,
+) -> None:
+    """
+    jobs = [(key, docx_path, pdf_path), ...] — конвертирует в нескольких процессах.
+    on_doc(key, error | None) вызывается в текущем потоке по каждому документу.
+    Зависший документ (дольше timeout) — ошибка этой строки: работник и его
+    Word/LibreOffice убиваются, вместо него запускается новый. Каждый работник
+    перезапускается после recycle_after документов (утечки памяти Word).
+    В работе не больше одного документа на работника — очередь ограничена.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return
+    ctx = mp.get_context()
+    outbox = ctx.Queue()
+    it = iter(jobs)
+    left = len(jobs)
+    pool: dict[int, _Worker] = {}
+    next_wid = 0
+    open_error = None
+
+    def spawn():
+        nonlocal next_wid
+        w = _Worker(ctx, next_wid, backend_name, timeout, outbox)
+        pool[w.wid] = w
+        next_wid += 1
+
+    def feed(w: _Worker):
+        job = next(it, None)
+        if job is None:
+            w.stop()
+        else:
+            w.give(job)
+
+    for _ in range(max(1, min(int(workers), len(jobs)))):
+        spawn()
+
+    try:
+        while left:
+            try:
+                kind, wid, key, payload = outbox.get(timeout=0.5)
+            except queue.Empty:
+                kind = None
+
+            if kind == "ready" and wid in pool:
+                w = pool[wid]
+                w.ready, w.helper_pids = True, payload
+                feed(w)
+            elif kind == "dead" and wid in pool:
+                pool.pop(wid).proc.join(5)
+                open_error = payload
+            elif kind == "done" and wid in pool:
+                w = pool[wid]
+                w.job = None
+                w.done += 1
+                left -= 1
+                on_doc(key, payload)
+                if w.done >= recycle_after and left:
+                    w.stop()
+                    w.proc.join(30)
+                    if w.proc.is_alive():
+                        w.kill()
+                    pool.pop(wid)
+                    spawn()
+                else:
+                    feed(w)
+
+            # зависшие и упавшие работники
+            now = time.monotonic()
+            for w in list(pool.values()):
+                if w.ready:
+                    hung = w.job is not None and now - w.started > timeout
+                    crashed = w.job is not None and not w.proc.is_alive()
+                else:
+                    hung = now - w.spawned > timeout  # Word/LibreOffice не открылся
+                    # exitcode 0 — работник сам сообщил об ошибке ("dead"), сообщение ещё в очереди
+                    crashed = not w.proc.is_alive() and w.proc.exitcode != 0
+                if not (hung or crashed):
+                    continue
+                w.kill()
+                pool.pop(w.wid)
+                if w.job is not None:
+                    left -= 1
+                    on_doc(w.job[0], f"таймаут {timeout:g} с" if hung else "процесс конвертера упал")
+                    spawn()
+                elif not w.ready:
+                    open_error = open_error or "процесс конвертера не запустился"
+
+            # ни одного живого работника (конвертер не открывается) — остальное не сделать
+            if not pool and left:
+                msg = f"конвертер не запустился: {open_error}" if open_error else "конвертер не запустился"
+                for key, _src, _dst in it:
+                    on_doc(key, msg)
+                break
+    finally:
+        for w in pool.values():
+            w.stop()
+        for w in pool.values():
+            w.proc.join(10)
+            if w.proc.is_alive():
+                w.kill()
@@ -0,0 +1,68 @@
+import os
+
+class PdfInventory:
+    """
+    Какие PDF лежат в RESULT/PDF — без listdir на каждом обновлении статуса.
+    Сборка сообщает о своих файлах (add/discard) и в конце вызывает sync();
+    изменения со стороны (удалили/подложили руками) ловит сравнение mtime
+    папки — один stat вместо чтения каталога.
+    version растёт при каждом изменении набора: по нему кэшируются подсчёты.
+    """
+    def __init__(self):
+        self.pdf_dir = ""
+        self.names: set[str] = set()
+        self.version = 0
+        self._mtime = None
+
+    def attach(self, pdf_dir: str):
+        """Папка проекта сменилась — набор читается заново при следующем обращении."""
+        if os.path.abspath(pdf_dir) != self.pdf_dir:
+            self.pdf_dir = os.path.abspath(pdf_dir)
+            self.names = set()
+            self._mtime = None
+            self.version += 1
+
+    def _dir_mtime(self):
+        try:
+            return os.stat(self.pdf_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def _rescan(self, mtime):
+        try:
+            names = {f for f in os.listdir(self.pdf_dir) if f.lower().endswith(".pdf")}
+        except OSError:
+            names = set()
+        if names != self.names:
+            self.names = names
+            self.version += 1
+        self._mtime = mtime
+
+    def check(self):
+        """Дешёвая проверка: папку трогали не мы — перечитать её."""
+        if not self.pdf_dir:
+            return
+        mtime = self._dir_mtime()
+        if mtime != self._mtime:
+            self._rescan(mtime)
+
+    def add(self, path: str):
+        name = os.path.basename(path)
+        if name not in self.names:
+            self.names.add(name)
+            self.version += 1
+
+    def discard(self, path: str):
+        name = os.path.basename(path)
+        if name in self.names:
+            self.names.discard(name)
+            self.version += 1
+
+    def sync(self):
+        """Конец стадии сборки: всё, что поменяло mtime папки, уже учтено через add()."""
+        if self.pdf_dir and self._mtime is not None:
+            self._mtime = self._dir_mtime()
+
+    def count(self) -> int:
+        self.check()
+        return len(self.names)
@@ -0,0 +1,106 @@
+import hashlib
+import os
+import re
+
+import fitz  # PyMuPDF
+
+_REF_RE = re.compile(r"(\d+) 0 R")
+
+class _SharedObjects:
+    """
+    Общие объекты склейки: одинаковые шрифты, фон, картинки, цветовые профили
+    разных открыток хранятся один раз. После вставки каждого файла его новые
+    объекты сравниваются с уже известными (от листьев к корням — словарь со
+    ссылками, уже переписанными на общие объекты, + хэш потока); дубликаты
+    сразу обнуляются, поэтому память не растёт с каждой открыткой.
+    """
+    def __init__(self, doc):
+        self.doc = doc
+        self.seen: dict[str, int] = {}
+
+    def absorb(self, first: int):
+        doc = self.doc
+        end = doc.xref_length()
+        objs = {x: doc.xref_object(x, compressed=True) for x in range(first, end)}
+        remap: dict[int, int] = {}
+
+        def sub(obj: str) -> str:
+            return _REF_RE.sub(lambda m: f"{remap.get(int(m[1]), int(m[1]))} 0 R", obj)
+
+        # страницы (и всё, что на них ссылается) не объединяем
+        done = {x for x, o in objs.items() if "/Type/Page" in o or o == "null"}
+        pending = [x for x in objs if x not in done]
+        while pending:
+            rest = []
+            for x in pending:
+                if any(first <= int(r) < end and int(r) != x and int(r) not in done for r in _REF_RE.findall(objs[x])):
+                    rest.append(x)  # сначала — объекты, на которые он ссылается
+                    continue
+                key = sub(objs[x])
+                if doc.xref_is_stream(x):
+                    key += hashlib.sha1(doc.xref_stream_raw(x)).hexdigest()
+                known = self.seen.get(key)
+                if known is None:
+                    self.seen[key] = x
+                else:
+                    remap[x] = known
+                done.add(x)
+            if len(rest) == len(pending):
+                break  # циклические ссылки — остаются как есть
+            pending = rest
+
+        if not remap:
+            return
+        for x, obj in objs.items():
+            if x not in remap:
+                new = sub(obj)
+                if new != obj:
+                    doc.update_object(x, new)
+        for x in remap:
+            if doc.xref_is_stream(x):
+                doc.update_stream(x, b"", compress=False)
+            doc.update_object(x, "null")
+
+def merge_pdfs(paths: list[str], out_path: str, progress_cb=None) -> dict:
+    """
+    Склеивает PDF в один файл для печати (порядок — как в paths).
+    Файлы подкачиваются по одному, общие ресурсы открыток хранятся один раз.
+    """
+    doc = fitz.open()
+    shared = _SharedObjects(doc)
+    pages = merged = 0
+    missing = 0
+    src_size = 0
+    total = len(paths)
+    tmp = out_path + ".tmp"
+    try:
+        for n, path in enumerate(paths, start=1):
+            if not os.path.exists(path):
+                missing += 1
+            else:
+                first = doc.xref_length()
+                src = fitz.open(path)
+                try:
+                    doc.insert_pdf(src)
+                    pages += len(src)
+                finally:
+                    src.close()
+                shared.absorb(first)
+                merged += 1
+                src_size += os.path.getsize(path)
+            if progress_cb:
+                progress_cb(n, total)
+
+        if not pages:
+            raise RuntimeError("Нет PDF для склейки. Сначала собери PDF.")
+        doc.save(tmp, garbage=2, deflate=True)
+        os.replace(tmp, out_path)
+    finally:
+        doc.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    return {
+        "out": out_path, "files": merged, "pages": pages, "missing": missing,
+        "size": os.path.getsize(out_path), "src_size": src_size,
+    }
@@ -0,0 +1,89 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from config import PDF_OPT_DPI, PDF_OPT_JPEG_QUALITY, PDF_OPT_PROCESSES
+
+def _downsample_images_manual(doc, dpi: int, quality: int):
+    """Для старых PyMuPDF без Document.rewrite_images: картинки с DPI выше цели → JPEG нужного размера."""
+    done = set()
+    for page in doc:
+        for img in page.get_images(full=True):
+            xref, smask = img[0], img[1]
+            if xref in done or smask:
+                continue  # с прозрачностью не трогаем — JPEG её потеряет
+            done.add(xref)
+            rects = page.get_image_rects(xref)
+            if not rects:
+                continue
+            w_pt = max(r.width for r in rects)
+            if w_pt <= 0:
+                continue
+            pix = fitz.Pixmap(doc, xref)
+            cur_dpi = pix.width / (w_pt / 72.0)
+            if cur_dpi <= dpi * 1.2:
+                continue
+            if pix.n - pix.alpha >= 4:
+                pix = fitz.Pixmap(fitz.csRGB, pix)
+            im = Image.frombytes("RGB" if pix.n >= 3 else "L", (pix.width, pix.height), pix.samples)
+            k = dpi / cur_dpi
+            im = im.resize((max(1, round(im.width * k)), max(1, round(im.height * k))), Image.LANCZOS)
+            buf = io.BytesIO()
+            im.save(buf, "JPEG", quality=quality, optimize=True)
+            page.replace_image(xref, stream=buf.getvalue())
+
+def optimize_pdf(path: str, dpi: int = PDF_OPT_DPI, quality: int = PDF_OPT_JPEG_QUALITY) -> tuple[int, int]:
+    """
+    Сжимает PDF на месте: подмножества шрифтов, картинки не выше dpi,
+    deflate + сборка мусора. Если результат не меньше — файл не трогается.
+    Возвращает (размер до, размер после).
+    """
+    before = os.path.getsize(path)
+    tmp = path + ".opt.tmp"
+    doc = fitz.open(path)
+    try:
+        if hasattr(doc, "rewrite_images"):
+            doc.rewrite_images(dpi_threshold=int(dpi * 1.2), dpi_target=dpi, quality=quality)
+        else:
+            _downsample_images_manual(doc, dpi, quality)
+        try:
+            doc.subset_fonts()
+        except Exception:
+            pass  # шрифт не поддаётся — оставляем целиком
+        doc.save(tmp, garbage=4, deflate=True, deflate_images=True, deflate_fonts=True, clean=True)
+    finally:
+        doc.close()
+
+    after = os.path.getsize(tmp)
+    if after < before:
+        os.replace(tmp, path)
+        return before, after
+    os.remove(tmp)
+    return before, before
+
+def _optimize_one(path: str, dpi: int, quality: int):
+    try:
+        return path, optimize_pdf(path, dpi, quality), None
+    except Exception as e:
+        return path, None, str(e) or e.__class__.__name__
+
+def optimize_batch(paths: list[str], on_file, processes: int = PDF_OPT_PROCESSES,
+                   dpi: int = PDF_OPT_DPI, quality: int = PDF_OPT_JPEG_QUALITY) -> None:
+    """
+    Сжимает файлы в нескольких процессах.
+    on_file(path, (до, после) | None, error | None) — в текущем потоке, по мере готовности.
+    """
+    if not paths:
+        return
+    processes = max(1, min(int(processes), len(paths)))
+    if processes == 1:
+        for p in paths:
+            on_file(*_optimize_one(p, dpi, quality))
+        return
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(_optimize_one, p, dpi, quality) for p in paths]
+        for fut in as_completed(futures):
+            on_file(*fut.result())
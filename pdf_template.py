@@ -0,0 +1,205 @@
+from dataclasses import dataclass
+
+import fitz  # PyMuPDF
+
+from config import PDF_FONT_FILE, PDF_DEFAULT_FONTSIZE, PDF_MIN_FONTSIZE
+from docx_template import PLACEHOLDERS
+
+FONT_NAME = "PcF0"     # имя шрифта в ресурсах страницы
+LINE_SPACING = 1.2     # межстрочный интервал, в кеглях
+
+@dataclass
+class Slot:
+    """Область страницы под одну метку."""
+    placeholder: str
+    page: int
+    rect: fitz.Rect
+    fontsize: float
+    align: int  # fitz.TEXT_ALIGN_LEFT / CENTER / RIGHT
+
+def _field_placeholder(name: str, placeholders) -> str | None:
+    """Поле формы OBRASHENIE / <<OBRASHENIE>> → "<<OBRASHENIE>>"."""
+    name = (name or "").strip()
+    for ph in placeholders:
+        if name in (ph, ph.strip("<>")):
+            return ph
+    return None
+
+def _span_fontsize(page, rect: fitz.Rect, placeholder: str) -> float:
+    for block in page.get_text("dict", clip=rect + (-2, -2, 2, 2))["blocks"]:
+        for line in block.get("lines", ()):
+            for span in line["spans"]:
+                if "<<" in span["text"] or placeholder.strip("<>") in span["text"]:
+                    return float(span["size"])
+    return PDF_DEFAULT_FONTSIZE
+
+def _text_area(page, rect: fitz.Rect, below: list[float]) -> tuple[fitz.Rect, int]:
+    """
+    Область для текста по месту метки: поля слева/справа симметричны, вниз —
+    до следующей метки или до нижнего поля. Метка по центру страницы → центрирование.
+    """
+    w, h = page.rect.width, page.rect.height
+    margin = min(rect.x0, w - rect.x1)
+    centered = abs((rect.x0 + rect.x1) / 2 - w / 2) < w * 0.05
+    x0 = margin if centered else rect.x0
+    y1 = min([y for y in below if y > rect.y1] + [h - max(margin, 18)])
+    return fitz.Rect(x0, rect.y0, w - x0, max(y1, rect.y1)), (fitz.TEXT_ALIGN_CENTER if centered else fitz.TEXT_ALIGN_LEFT)
+
+def find_slots(doc, placeholders=PLACEHOLDERS) -> list[Slot]:
+    """
+    Ищет области меток и убирает сами метки из документа:
+    поля формы с именем OBRASHENIE/TEXT (или <<...>>) либо текст «<<...>>» на странице.
+    """
+    slots = []
+    for page in doc:
+        found = []
+        for w in list(page.widgets() or ()):
+            ph = _field_placeholder(w.field_name, placeholders)
+            if ph is None:
+                continue
+            q = doc.xref_get_key(w.xref, "Q")[1]
+            align = {"1": fitz.TEXT_ALIGN_CENTER, "2": fitz.TEXT_ALIGN_RIGHT}.get(q, fitz.TEXT_ALIGN_LEFT)
+            slots.append(Slot(ph, page.number, fitz.Rect(w.rect), float(w.text_fontsize or PDF_DEFAULT_FONTSIZE), align))
+            page.delete_widget(w)
+
+        for ph in placeholders:
+            for r in page.search_for(ph):
+                found.append((ph, r, _span_fontsize(page, r, ph)))
+        if not found:
+            continue
+        tops = [r.y0 for _ph, r, _fs in found]
+        for ph, r, fs in found:
+            area, align = _text_area(page, r, tops)
+            slots.append(Slot(ph, page.number, area, fs, align))
+            page.add_redact_annot(r)
+        page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE, graphics=fitz.PDF_REDACT_LINE_ART_NONE)
+    return slots
+
+class PdfTemplate:
+    """
+    Шаблон PDF, подготовленный один раз на всю пачку открыток.
+    Метки убираются из эталона, шрифт встраивается в эталон один раз,
+    на каждую страницу с метками добавляется пустой поток содержимого.
+    Для строки эталон открывается из байтов, и в этот поток пишется готовый
+    текст (раскладка по строкам считается здесь же, по метрикам шрифта).
+    Ни Word, ни DOCX не нужны.
+    """
+    def __init__(self, path: str, placeholders=PLACEHOLDERS, fontfile: str = PDF_FONT_FILE):
+        self.path = path
+        self.font = fitz.Font(fontfile=fontfile) if fontfile else fitz.Font("tiro")
+        self._gids: dict[str, int] = {}
+        self._layouts: dict[tuple, bytes] = {}
+
+        doc = fitz.open(path)
+        try:
+            if not doc.is_pdf:
+                raise RuntimeError("Шаблон должен быть PDF.")
+            self.slots = find_slots(doc, placeholders)
+            if not self.slots:
+                raise RuntimeError("В PDF-шаблоне нет меток: ни полей OBRASHENIE/TEXT, ни текста <<OBRASHENIE>>/<<TEXT>>.")
+
+            # {номер страницы: xref потока для текста строки}
+            self.streams: dict[int, int] = {}
+            self.pdf_matrix: dict[int, fitz.Matrix] = {}
+            for pno in sorted({s.page for s in self.slots}):
+                page = doc[pno]
+                page.wrap_contents()  # чужие q/cm шаблона не должны влиять на наш текст
+                if fontfile:
+                    page.insert_font(fontname=FONT_NAME, fontfile=fontfile)
+                else:
+                    page.insert_font(fontname=FONT_NAME, fontbuffer=self.font.buffer)
+                xref = doc.get_new_xref()
+                doc.update_object(xref, "<<>>")
+                doc.update_stream(xref, b" ")
+                contents = page.get_contents() + [xref]
+                doc.xref_set_key(page.xref, "Contents", "[" + " ".join(f"{x} 0 R" for x in contents) + "]")
+                self.streams[pno] = xref
+                self.pdf_matrix[pno] = ~page.transformation_matrix
+            self.master = doc.tobytes(garbage=1, deflate=True)  # garbage>=2 перенумеровал бы xref потоков
+        finally:
+            doc.close()
+
+    # ---- раскладка текста ----
+    def _gid_hex(self, text: str) -> str:
+        out = []
+        for ch in text:
+            gid = self._gids.get(ch)
+            if gid is None:
+                gid = self._gids[ch] = self.font.has_glyph(ord(ch))
+            out.append(f"{gid:04x}")
+        return "".join(out)
+
+    def _wrap(self, text: str, width: float, fontsize: float) -> list[str]:
+        lines = []
+        space = self.font.text_length(" ", fontsize)
+        for para in text.split("\n"):
+            cur, cur_w = [], 0.0
+            for word in para.split():
+                ww = self.font.text_length(word, fontsize)
+                if cur and cur_w + space + ww > width:
+                    lines.append(" ".join(cur))
+                    cur, cur_w = [], 0.0
+                cur_w += (space if cur else 0.0) + ww
+                cur.append(word)
+            lines.append(" ".join(cur))
+        return lines
+
+    def _layout(self, slot: Slot, text: str) -> bytes:
+        """Команды PDF для текста в области слота; кегль уменьшается, пока текст не влезет."""
+        key = (slot.placeholder, slot.page, tuple(slot.rect), text)
+        cached = self._layouts.get(key)
+        if cached is not None:
+            return cached
+
+        rect = slot.rect
+        fontsize = slot.fontsize
+        while True:
+            lines = self._wrap(text, rect.width, fontsize)
+            if len(lines) * fontsize * LINE_SPACING <= rect.height + fontsize * (LINE_SPACING - 1) or fontsize <= PDF_MIN_FONTSIZE:
+                break
+            fontsize = max(PDF_MIN_FONTSIZE, fontsize - 0.5)
+
+        missing = sorted({ch for ch in text if not ch.isspace() and not self.font.has_glyph(ord(ch))})
+        if missing:
+            raise RuntimeError(f"В шрифте PDF нет символов: {''.join(missing)}")
+
+        m = self.pdf_matrix[slot.page]
+        ops = [f"BT /{FONT_NAME} {fontsize:g} Tf 0 g"]
+        y = rect.y0 + self.font.ascender * fontsize
+        for line in lines:
+            lw = self.font.text_length(line, fontsize)
+            if slot.align == fitz.TEXT_ALIGN_CENTER:
+                x = rect.x0 + (rect.width - lw) / 2
+            elif slot.align == fitz.TEXT_ALIGN_RIGHT:
+                x = rect.x1 - lw
+            else:
+                x = rect.x0
+            p = fitz.Point(x, y) * m
+            ops.append(f"1 0 0 1 {p.x:.2f} {p.y:.2f} Tm <{self._gid_hex(line)}> Tj")
+            y += fontsize * LINE_SPACING
+        ops.append("ET")
+        data = ("\n".join(ops) + "\n").encode("ascii")
+        self._layouts[key] = data
+        return data
+
+    # ---- заполнение ----
+    def render(self, mapping: dict[str, str]) -> bytes:
+        """PDF строки целиком (байты)."""
+        per_page: dict[int, list[bytes]] = {}
+        for slot in self.slots:
+            text = mapping.get(slot.placeholder, "")
+            if text:
+                per_page.setdefault(slot.page, []).append(self._layout(slot, text))
+
+        doc = fitz.open("pdf", self.master)
+        try:
+            for pno, chunks in per_page.items():
+                doc.update_stream(self.streams[pno], b"q\n" + b"".join(chunks) + b"Q\n")
+            return doc.tobytes()
+        finally:
+            doc.close()
+
+    def save(self, out_path: str, mapping: dict[str, str]):
+        data = self.render(mapping)
+        with open(out_path, "wb") as f:
+            f.write(data)
@@ -1,18 +1,245 @@
+import os
+import queue
+import threading
+from collections import OrderedDict
+
 import fitz  # PyMuPDF
 from PIL import Image, ImageTk
 
-def render_pdf_page_to_photoimage(pdf_path: str, page_index: int, canvas_w: int, canvas_h: int) -> ImageTk.PhotoImage:
-    doc = fitz.open(pdf_path)
-    try:
-        page = doc.load_page(page_index)
-        rect = page.rect
-        target_w = max(200, int(canvas_w) - 20)
-        target_h = max(200, int(canvas_h) - 20)
-        scale = min(target_w / max(1.0, rect.width), target_h / max(1.0, rect.height))
-        scale = max(0.6, min(4.0, scale))
-        pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-        img.thumbnail((target_w, target_h))
-        return ImageTk.PhotoImage(img)
-    finally:
-        doc.close()
\ No newline at end of file
+from config import PREVIEW_MAX_DOCS, PREVIEW_CACHE_MB, PREVIEW_DRAFT_SCALE
+
+# MuPDF не потокобезопасен: всё, что трогает fitz, — под этим замком
+FITZ_LOCK = threading.RLock()
+
+def _fit(rect, canvas_w: int, canvas_h: int) -> tuple[float, int, int]:
+    target_w = max(200, int(canvas_w) - 20)
+    target_h = max(200, int(canvas_h) - 20)
+    scale = min(target_w / max(1.0, rect.width), target_h / max(1.0, rect.height))
+    scale = max(0.6, min(4.0, scale))
+    return round(scale, 2), target_w, target_h
+
+class PreviewCache:
+    """
+    Кэш превью PDF: LRU открытых документов fitz и LRU готовых картинок
+    с лимитом по памяти. Ключ картинки — (путь, mtime, размер, страница, масштаб),
+    поэтому пересобранный PDF рисуется заново сам. prefetch() дорисовывает
+    соседние строки в фоновом потоке.
+    """
+    def __init__(self, max_docs: int = PREVIEW_MAX_DOCS, max_mb: float = PREVIEW_CACHE_MB):
+        self.max_docs = max_docs
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._docs: OrderedDict = OrderedDict()     # (path, mtime, size) -> fitz.Document
+        self._images: OrderedDict = OrderedDict()   # (path, mtime, size, page, scale) -> PIL.Image
+        self._rects: dict = {}                      # (path, mtime, size, page) -> размер страницы
+        self._bytes = 0
+        self._lock = threading.Lock()               # структуры кэша
+        self._jobs: queue.Queue = queue.Queue()
+        self._thread = None
+
+    # ---- ключи / документы ----
+    @staticmethod
+    def _file_key(path: str):
+        st = os.stat(path)
+        return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+    def _doc(self, fkey):
+        """Открытый документ (под FITZ_LOCK)."""
+        doc = self._docs.get(fkey)
+        if doc is not None:
+            self._docs.move_to_end(fkey)
+            return doc
+        # из байтов: открытый файл на Windows не дал бы пересобрать этот PDF
+        with open(fkey[0], "rb") as f:
+            doc = fitz.open("pdf", f.read())
+        self._docs[fkey] = doc
+        # старые версии того же файла и лишние документы закрываем
+        for k in [k for k in self._docs if k[0] == fkey[0] and k != fkey]:
+            self._docs.pop(k).close()
+        while len(self._docs) > self.max_docs:
+            _k, old = self._docs.popitem(last=False)
+            old.close()
+        return doc
+
+    def _cached(self, key):
+        with self._lock:
+            img = self._images.get(key)
+            if img is not None:
+                self._images.move_to_end(key)
+            return img
+
+    def _put(self, key, img: Image.Image):
+        with self._lock:
+            if key in self._images:
+                return
+            self._images[key] = img
+            self._bytes += img.width * img.height * len(img.getbands())
+            while self._bytes > self.max_bytes and len(self._images) > 1:
+                _k, old = self._images.popitem(last=False)
+                self._bytes -= old.width * old.height * len(old.getbands())
+
+    # ---- отрисовка ----
+    def render(self, path: str, page_index: int, canvas_w: int, canvas_h: int) -> Image.Image:
+        """PIL-картинка страницы под размер холста (из кэша, если есть)."""
+        fkey = self._file_key(path)
+        img = None
+        rect = self._rects.get(fkey + (page_index,))
+        if rect is not None:
+            # попадание в кэш не ждёт FITZ_LOCK (его может держать фоновая подкачка)
+            scale, target_w, target_h = _fit(rect, canvas_w, canvas_h)
+            img = self._cached(fkey + (page_index, scale))
+        if img is None:
+            with FITZ_LOCK:
+                page = self._doc(fkey).load_page(page_index)
+                self._rects[fkey + (page_index,)] = page.rect
+                scale, target_w, target_h = _fit(page.rect, canvas_w, canvas_h)
+                key = fkey + (page_index, scale)
+                img = self._cached(key)
+                if img is None:
+                    pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                    self._put(key, img)
+        if img.width > target_w or img.height > target_h:
+            img = img.copy()
+            img.thumbnail((target_w, target_h))
+        return img
+
+    def peek(self, path: str, page_index: int, canvas_w: int, canvas_h: int) -> Image.Image | None:
+        """Готовая картинка из кэша или None — без отрисовки и без FITZ_LOCK."""
+        try:
+            fkey = self._file_key(path)
+        except OSError:
+            return None
+        rect = self._rects.get(fkey + (page_index,))
+        if rect is None:
+            return None
+        scale, target_w, target_h = _fit(rect, canvas_w, canvas_h)
+        img = self._cached(fkey + (page_index, scale))
+        if img is not None and (img.width > target_w or img.height > target_h):
+            img = img.copy()
+            img.thumbnail((target_w, target_h))
+        return img
+
+    def render_draft(self, path: str, page_index: int, canvas_w: int, canvas_h: int,
+                     factor: float = PREVIEW_DRAFT_SCALE) -> Image.Image:
+        """Быстрый черновик: мелкий растр, растянутый до размера превью (в кэш не идёт)."""
+        fkey = self._file_key(path)
+        with FITZ_LOCK:
+            page = self._doc(fkey).load_page(page_index)
+            self._rects[fkey + (page_index,)] = page.rect
+            scale, target_w, target_h = _fit(page.rect, canvas_w, canvas_h)
+            pix = page.get_pixmap(matrix=fitz.Matrix(scale * factor, scale * factor), alpha=False)
+            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+        w = min(target_w, round(page.rect.width * scale))
+        h = min(target_h, round(page.rect.height * scale))
+        return img.resize((max(1, w), max(1, h)), Image.BILINEAR)
+
+    def photo(self, path: str, page_index: int, canvas_w: int, canvas_h: int) -> ImageTk.PhotoImage:
+        """PhotoImage для холста — только из главного потока Tk."""
+        return ImageTk.PhotoImage(self.render(path, page_index, canvas_w, canvas_h))
+
+    # ---- фоновая подкачка ----
+    def prefetch(self, paths: list[str], canvas_w: int, canvas_h: int):
+        """Отрисовать paths заранее; прошлые, ещё не начатые задания отменяются."""
+        try:
+            while True:
+                self._jobs.get_nowait()
+        except queue.Empty:
+            pass
+        for p in paths:
+            self._jobs.put((p, canvas_w, canvas_h))
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._prefetch_loop, name="preview-prefetch", daemon=True)
+            self._thread.start()
+
+    def _prefetch_loop(self):
+        while True:
+            path, w, h = self._jobs.get()
+            try:
+                if os.path.exists(path):
+                    self.render(path, 0, w, h)
+            except Exception:
+                pass  # битый/недописанный PDF — покажем ошибку, когда его выберут
+
+    def clear(self):
+        with FITZ_LOCK:
+            for doc in self._docs.values():
+                doc.close()
+            self._docs.clear()
+            with self._lock:
+                self._images.clear()
+                self._rects.clear()
+                self._bytes = 0
+
+class PreviewRenderer:
+    """
+    Отрисовка превью вне потока Tk: сначала черновик, потом полное качество.
+    Каждый submit() отменяет прошлые запросы (номер поколения): недоделанный
+    черновик/растр старой строки в UI уже не попадёт. Результаты UI забирает
+    poll() из after() — Tk трогается только из главного потока.
+    """
+    def __init__(self, cache: PreviewCache):
+        self.cache = cache
+        self.results: queue.Queue = queue.Queue()
+        self._gen = 0
+        self._request = None
+        self._busy = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._loop, name="preview-render", daemon=True)
+        self._thread.start()
+
+    def submit(self, path: str, page_index: int, canvas_w: int, canvas_h: int) -> int:
+        with self._cond:
+            self._gen += 1
+            self._request = (self._gen, path, page_index, canvas_w, canvas_h)
+            self._cond.notify()
+            return self._gen
+
+    def cancel(self):
+        with self._cond:
+            self._gen += 1
+            self._request = None
+
+    def busy(self) -> bool:
+        with self._cond:
+            return self._busy or self._request is not None
+
+    def _current(self, gen: int) -> bool:
+        with self._cond:
+            return gen == self._gen
+
+    def poll(self) -> list[tuple]:
+        """[(gen, "draft" | "final" | "error", картинка | текст ошибки), ...] только для актуального запроса."""
+        out = []
+        try:
+            while True:
+                res = self.results.get_nowait()
+                if self._current(res[0]):
+                    out.append(res)
+        except queue.Empty:
+            pass
+        return out
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._request is None:
+                    self._cond.wait()
+                gen, path, page_index, w, h = self._request
+                self._request = None
+                self._busy = True
+            try:
+                img = self.cache.peek(path, page_index, w, h)
+                if img is None:
+                    draft = self.cache.render_draft(path, page_index, w, h)
+                    if not self._current(gen):
+                        continue
+                    self.results.put((gen, "draft", draft))
+                    img = self.cache.render(path, page_index, w, h)
+                if self._current(gen):
+                    self.results.put((gen, "final", img))
+            except Exception as e:
+                if self._current(gen):
+                    self.results.put((gen, "error", str(e) or e.__class__.__name__))
+            finally:
+                with self._cond:
+                    self._busy = False
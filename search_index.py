@@ -0,0 +1,94 @@
+from bisect import bisect_left
+
+from utils import fio_key
+
+SEARCH_FIELDS = ("Фамилия", "Имя", "E-mail")
+
+class SearchIndex:
+    """
+    Префиксный поиск строк по фамилии, имени и e-mail (fio_key: нижний
+    регистр, Ё→Е). Ключи всех полей лежат в одном отсортированном массиве,
+    префикс — это отрезок, найденный bisect. Запрос из нескольких слов:
+    каждое слово должно быть началом какого-то поля. Уточнение запроса
+    ("ива" → "иван") перепроверяет прошлый результат, если он намного меньше
+    отрезка bisect.
+    """
+    def __init__(self):
+        self._keys: list[str] = []
+        self._ids: list = []                 # idx строки, параллельно _keys
+        self._row_keys: dict = {}            # idx -> ключи полей строки
+        self._last_q = None
+        self._last: set | None = None
+
+    def build(self, df):
+        cols = [df[c].tolist() if c in df.columns else [""] * len(df) for c in SEARCH_FIELDS]
+        pairs = []
+        self._row_keys = {}
+        memo: dict = {}  # имена и фамилии сильно повторяются
+        for idx, *vals in zip(df.index, *cols):
+            keys = []
+            for v in vals:
+                k = memo.get(v)
+                if k is None:
+                    k = memo[v] = fio_key(v)
+                keys.append(k)
+            keys = tuple(keys)
+            self._row_keys[idx] = keys
+            pairs.extend((k, idx) for k in keys if k)
+        pairs.sort(key=lambda p: p[0])
+        self._keys = [k for k, _i in pairs]
+        self._ids = [i for _k, i in pairs]
+        self._last_q = self._last = None
+
+    def update(self, idx, row):
+        """Строка изменилась: переставить её ключи (и поправить кэш последнего запроса)."""
+        for k in self._row_keys.get(idx, ()):
+            if not k:
+                continue
+            i = bisect_left(self._keys, k)
+            while i < len(self._keys) and self._keys[i] == k:
+                if self._ids[i] == idx:
+                    del self._keys[i]
+                    del self._ids[i]
+                    break
+                i += 1
+        keys = tuple(fio_key(row.get(c, "")) for c in SEARCH_FIELDS)
+        self._row_keys[idx] = keys
+        for k in keys:
+            if k:
+                i = bisect_left(self._keys, k)
+                self._keys.insert(i, k)
+                self._ids.insert(i, idx)
+        if self._last is not None:
+            if self._matches(idx, self._last_q.split()):
+                self._last.add(idx)
+            else:
+                self._last.discard(idx)
+
+    def _range(self, word: str) -> tuple[int, int]:
+        """Отрезок _keys, ключи которого начинаются с word."""
+        lo = bisect_left(self._keys, word)
+        return lo, bisect_left(self._keys, word + "\uffff", lo)
+
+    def _matches(self, idx, words: list[str]) -> bool:
+        keys = self._row_keys.get(idx, ())
+        return all(any(k.startswith(w) for k in keys) for w in words)
+
+    def search(self, query: str) -> set | None:
+        """Множество idx подходящих строк; None — пустой запрос (фильтра нет)."""
+        q = fio_key(query)
+        words = q.split()
+        if not words:
+            return None
+        ranges = sorted((self._range(w) for w in words), key=lambda r: r[1] - r[0])
+        lo, hi = ranges[0]
+        if self._last is not None and q.startswith(self._last_q) and len(self._last) * 8 < hi - lo:
+            # уточнение: проверяем только то, что подошло в прошлый раз
+            found = {i for i in self._last if self._matches(i, words)}
+        else:
+            # строка подходит под слово <=> её idx есть в отрезке этого слова
+            found = set(self._ids[lo:hi])
+            for lo, hi in ranges[1:]:
+                found &= set(self._ids[lo:hi])
+        self._last_q, self._last = q, found
+        return set(found)
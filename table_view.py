@@ -0,0 +1,180 @@
+import tkinter as tk
+from tkinter import ttk
+
+TABLE_BUFFER_ROWS = 10
+
+class VirtualTable:
+    """
+    Виртуальная таблица поверх ttk.Treeview: в виджете живут только видимые
+    строки + небольшой запас, остальное — просто список индексов (rows).
+    Прокрутка (свой вертикальный скроллбар, колесо, стрелки) сдвигает окно;
+    выделение хранится здесь же, поэтому переживает прокрутку.
+    row_view(idx, pos) -> (values, tags) — значения строки для показа.
+    Смена выделения пользователем — событие <<TableSelect>> на дереве.
+    """
+    def __init__(self, tree: ttk.Treeview, scrollbar: ttk.Scrollbar, row_view, buffer: int = TABLE_BUFFER_ROWS):
+        self.tree = tree
+        self.sb = scrollbar
+        self.row_view = row_view
+        self.buffer = buffer
+        self.rows: list[int] = []
+        self._pos: dict[int, int] = {}
+        self.top = 0
+        self.selected: set[int] = set()
+        self.focus_idx = None
+        self._shown: list[int] = []
+
+        self.sb.configure(command=self._on_scrollbar)
+        tree.bind("<Configure>", lambda _e: self.render(), add="+")
+        tree.bind("<MouseWheel>", self._on_wheel, add="+")
+        tree.bind("<Button-4>", lambda _e: self._on_wheel(_e, -3), add="+")
+        tree.bind("<Button-5>", lambda _e: self._on_wheel(_e, 3), add="+")
+        tree.bind("<Up>", lambda _e: self._on_arrow(-1))
+        tree.bind("<Down>", lambda _e: self._on_arrow(1))
+        tree.bind("<Prior>", lambda _e: self._on_arrow(-self.page()))
+        tree.bind("<Next>", lambda _e: self._on_arrow(self.page()))
+        tree.bind("<Button-1>", self._on_click, add="+")
+        tree.bind("<<TreeviewSelect>>", self._on_tree_select, add="+")
+
+    # ---- данные ----
+    def set_rows(self, rows: list[int]):
+        """Новый набор строк (фильтр/поиск). Выделение вне набора сбрасывается."""
+        self.rows = list(rows)
+        self._pos = {idx: i for i, idx in enumerate(self.rows)}
+        self.selected &= self._pos.keys()
+        if self.focus_idx not in self._pos:
+            self.focus_idx = None
+        self.top = 0
+        self.render(force=True)
+
+    def update_row(self, idx: int):
+        """Перерисовать одну строку на месте (если она сейчас в окне)."""
+        iid = str(idx)
+        if idx in self._pos and self.tree.exists(iid):
+            values, tags = self.row_view(idx, self._pos[idx])
+            self.tree.item(iid, values=values, tags=tags)
+
+    def position(self, idx: int):
+        """Место строки в текущем наборе или None."""
+        return self._pos.get(idx)
+
+    def selection(self) -> list[int]:
+        """Выделенные строки в порядке таблицы."""
+        return sorted(self.selected, key=self._pos.__getitem__)
+
+    def current(self):
+        """Строка для превью: фокус, первая выделенная или первая в таблице."""
+        if self.focus_idx in self.selected:
+            return self.focus_idx
+        sel = self.selection()
+        if sel:
+            return sel[0]
+        return self.rows[0] if self.rows else None
+
+    def select(self, idx: int, notify: bool = True):
+        if idx not in self._pos:
+            return
+        self.selected = {idx}
+        self.focus_idx = idx
+        self.see(idx)
+        if notify:
+            self.tree.event_generate("<<TableSelect>>")
+
+    # ---- окно ----
+    def page(self) -> int:
+        """Сколько строк помещается в видимую часть дерева."""
+        try:
+            rh = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        except (tk.TclError, ValueError):
+            rh = 20
+        h = self.tree.winfo_height()
+        if h <= 1:
+            h = int(self.tree.cget("height") or 10) * rh
+        return max(1, h // rh)
+
+    def see(self, idx: int):
+        pos = self._pos.get(idx)
+        if pos is None:
+            return
+        page = self.page()
+        if pos < self.top:
+            self.top = pos
+        elif pos >= self.top + page - 1:
+            self.top = pos - page + 2  # шапка съедает часть высоты — держим запас в строку
+        self.render()
+
+    def scroll(self, delta: int):
+        self.top += delta
+        self.render()
+
+    def render(self, force: bool = False):
+        page = self.page()
+        n = len(self.rows)
+        self.top = max(0, min(self.top, n - page + 1))
+        window = self.rows[self.top:self.top + page + self.buffer]
+
+        tree = self.tree
+        if force or window != self._shown:
+            tree.delete(*tree.get_children())
+            for i, idx in enumerate(window, start=self.top):
+                values, tags = self.row_view(idx, i)
+                tree.insert("", "end", iid=str(idx), values=values, tags=tags)
+            self._shown = window
+            tree.yview_moveto(0)
+
+        # выделение/фокус дерева — из нашего состояния
+        want = tuple(str(i) for i in window if i in self.selected)
+        if set(tree.selection()) != set(want):
+            tree.selection_set(want)
+        if self.focus_idx is not None and tree.exists(str(self.focus_idx)):
+            tree.focus(str(self.focus_idx))
+
+        if n:
+            self.sb.set(self.top / n, min(1.0, (self.top + page) / n))
+        else:
+            self.sb.set(0.0, 1.0)
+
+    # ---- события ----
+    def _on_scrollbar(self, *args):
+        n = len(self.rows)
+        if not n:
+            return
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * n)
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self.top += step * (self.page() - 1 if args[2] == "pages" else 1)
+        self.render()
+
+    def _on_wheel(self, event, delta: int = 0):
+        self.scroll(delta or (-3 if event.delta > 0 else 3))
+        return "break"
+
+    def _on_arrow(self, delta: int):
+        if not self.rows:
+            return "break"
+        pos = self._pos.get(self.current(), 0)
+        pos = max(0, min(len(self.rows) - 1, pos + delta))
+        self.select(self.rows[pos])
+        return "break"
+
+    def _on_click(self, event):
+        # обычный клик без Ctrl/Shift сбрасывает и выделение за пределами окна
+        if event.state & 0x0005:
+            return
+        rowid = self.tree.identify_row(event.y)
+        if rowid:
+            self.selected = {int(rowid)}
+            self.focus_idx = int(rowid)
+            self.tree.event_generate("<<TableSelect>>")
+
+    def _on_tree_select(self, _event):
+        shown = set(self._shown)
+        now = {int(i) for i in self.tree.selection()}
+        if now == self.selected & shown:
+            return  # это наш же selection_set из render()
+        self.selected = (self.selected - shown) | now
+        focus = self.tree.focus()
+        if focus:
+            self.focus_idx = int(focus)
+        self.tree.event_generate("<<TableSelect>>")
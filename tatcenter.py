@@ -1,9 +1,17 @@
-from dataclasses import dataclass
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, replace
 from urllib.parse import urlencode
-import requests
 from bs4 import BeautifulSoup
 
-from config import BASE_URL, HEADERS
+try:
+    from lxml import html as lxml_html
+except Exception:
+    lxml_html = None
+
+from config import BASE_URL
+from tatcenter_http import TatcenterClient
+from fio_index import same_fio
 from utils import EMAIL_RE, norm_str, is_email_like
 
 def fio_for_search_row(row) -> str:
@@ -14,15 +22,74 @@ def fio_for_search_row(row) -> str:
             parts.append(v)
     return " ".join(parts).strip()
 
-def search_person_url(session: requests.Session, fio: str) -> str | None:
-    url = f"{BASE_URL}/search/?{urlencode({'search_text': fio})}"
-    try:
-        resp = session.get(url, headers=HEADERS, timeout=15)
-        resp.raise_for_status()
-    except Exception:
-        return None
+def _abs_url(href: str) -> str:
+    return BASE_URL + href if href.startswith("/") else href
+
+# ---- разбор HTML: быстрый путь (lxml + XPath по нужным местам) ----
+# lxml и так приходит с python-docx; если его нет или страница его "сломала" —
+# работает прежний разбор через BeautifulSoup (ниже, *_bs4).
+
+_NO_RESULT = object()  # быстрый путь не справился — нужен запасной разбор
+
+def _lxml_text(el, sep: str) -> str:
+    # аналог bs4 get_text(sep, strip=True): только текстовые узлы, без комментариев
+    return sep.join(t.strip() for t in el.xpath(".//text()") if t.strip())
+
+def _person_url_lxml(html: str):
+    root = lxml_html.fromstring(html)
+    containers = root.xpath('//div[@id="container"]')
+    if not containers:
+        return _NO_RESULT
+
+    person_href = None
+    for link in containers[0].iterfind(".//a[@href]"):
+        href = link.get("href")
+        tag_div = next(
+            (d for d in link.iterfind(".//div[@class]") if " ".join(d.get("class").split()) == "grey tag"),
+            None,
+        )
+        if tag_div is not None and "Кто есть кто" in _lxml_text(tag_div, ""):
+            return _abs_url(href)
+        if person_href is None and "/person/" in href:
+            person_href = href
+
+    return _abs_url(person_href) if person_href else None
+
+def _person_info_lxml(html: str):
+    root = lxml_html.fromstring(html)
+    spans = root.xpath('//span[contains(concat(" ", normalize-space(@class), " "), " span-bold ")]')
+    if not spans:
+        return _NO_RESULT
+
+    dob_span = next((sp for sp in spans if "Дата рождения" in sp.text_content()), None)
+    mail_span = next((sp for sp in spans if "Электронная почта" in sp.text_content()), None)
+
+    dob = None
+    if dob_span is not None and dob_span.getparent() is not None:
+        dob = _lxml_text(dob_span.getparent(), " ").replace("Дата рождения:", "").strip()
+
+    email = None
+    if mail_span is not None and mail_span.getparent() is not None:
+        block = mail_span.getparent()
+        a = next(block.iterfind(".//a[@href]"), None)
+        if a is not None and "mailto:" in a.get("href"):
+            email = a.get("href").replace("mailto:", "").strip()
+        else:
+            m = EMAIL_RE.search(_lxml_text(block, " "))
+            if m:
+                email = m.group(0)
+    return email, dob
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+def _person_name_lxml(html: str):
+    h1 = lxml_html.fromstring(html).xpath("//h1")
+    if not h1:
+        return _NO_RESULT
+    return norm_str(_lxml_text(h1[0], " ")) or None
+
+# ---- разбор HTML: запасной путь (полное дерево BeautifulSoup) ----
+
+def _person_url_bs4(html: str) -> str | None:
+    soup = BeautifulSoup(html, "html.parser")
     container = soup.find("div", id="container")
     if not container:
         return None
@@ -30,24 +97,17 @@ def search_person_url(session: requests.Session, fio: str) -> str | None:
     for link in container.find_all("a", href=True):
         tag_div = link.find("div", class_="grey tag")
         if tag_div and "Кто есть кто" in tag_div.get_text(strip=True):
-            href = link["href"]
-            return BASE_URL + href if href.startswith("/") else href
+            return _abs_url(link["href"])
 
     for link in container.find_all("a", href=True):
         href = link["href"]
         if "/person/" in href:
-            return BASE_URL + href if href.startswith("/") else href
+            return _abs_url(href)
 
     return None
 
-def parse_person_page(session: requests.Session, url: str) -> tuple[str | None, str | None]:
-    try:
-        resp = session.get(url, headers=HEADERS, timeout=15)
-        resp.raise_for_status()
-    except Exception:
-        return None, None
-
-    soup = BeautifulSoup(resp.text, "html.parser")
+def _person_info_bs4(html: str) -> tuple[str | None, str | None]:
+    soup = BeautifulSoup(html, "html.parser")
 
     dob = None
     dob_span = soup.find("span", class_="span-bold", string=lambda t: t and "Дата рождения" in t)
@@ -66,13 +126,168 @@ def parse_person_page(session: requests.Session, url: str) -> tuple[str | None,
             m = EMAIL_RE.search(block.get_text(" ", strip=True))
             if m:
                 email = m.group(0)
+    return email, dob
+
+def _person_name_bs4(html: str) -> str | None:
+    h1 = BeautifulSoup(html, "html.parser").find("h1")
+    return (norm_str(h1.get_text(" ", strip=True)) or None) if h1 else None
+
+def extract_person_url(html: str) -> str | None:
+    """URL человека со страницы поиска (HTML уже скачан)."""
+    if lxml_html is not None:
+        try:
+            res = _person_url_lxml(html)
+            if res is not _NO_RESULT:
+                return res
+        except Exception:
+            pass
+    return _person_url_bs4(html)
+
+def extract_person_info(html: str) -> tuple[str | None, str | None]:
+    """(email, dob) со страницы человека (HTML уже скачан)."""
+    res = _NO_RESULT
+    if lxml_html is not None:
+        try:
+            res = _person_info_lxml(html)
+        except Exception:
+            res = _NO_RESULT
+    email, dob = _person_info_bs4(html) if res is _NO_RESULT else res
 
     if email and not is_email_like(email):
         email = None
     return email, dob
 
+def extract_person_name(html: str) -> str | None:
+    """ФИО со страницы человека (заголовок h1)."""
+    if lxml_html is not None:
+        try:
+            res = _person_name_lxml(html)
+            if res is not _NO_RESULT:
+                return res
+        except Exception:
+            pass
+    return _person_name_bs4(html)
+
+# ---- сеть ----
+
 @dataclass
 class TatcenterResult:
     email: str = ""
     url: str = ""
-    dob: str = ""
\ No newline at end of file
+    dob: str = ""
+    etag: str = ""
+    last_modified: str = ""
+    not_modified: bool = False  # страница человека не менялась (304), данные из кэша
+    name: str = ""              # ФИО на странице человека (при 304 неизвестно)
+    by_candidate: bool = False  # URL — кандидат локального индекса, подтверждённый страницей
+
+def search_person_url(client: TatcenterClient, fio: str) -> str | None:
+    # сетевые ошибки не глотаем: иначе сбой сети попадёт в кэш как «не найден»
+    resp = client.get(f"{BASE_URL}/search/?{urlencode({'search_text': fio})}")
+    return extract_person_url(resp.text)
+
+def parse_person_page(client: TatcenterClient, url: str, cached: TatcenterResult | None = None) -> TatcenterResult:
+    """
+    Страница человека. Если есть cached с ETag/Last-Modified — условный GET:
+    на 304 возвращаются закэшированные e-mail/дата рождения.
+    """
+    etag = cached.etag if cached else ""
+    last_modified = cached.last_modified if cached else ""
+    resp = client.get(url, etag=etag, last_modified=last_modified)
+    if resp.status_code == 304 and cached is not None:
+        return TatcenterResult(
+            email=cached.email, url=url, dob=cached.dob,
+            etag=etag, last_modified=last_modified, not_modified=True,
+        )
+    email, dob = extract_person_info(resp.text)
+    return TatcenterResult(
+        email=email or "", url=url, dob=dob or "", name=extract_person_name(resp.text) or "",
+        etag=resp.headers.get("ETag", ""), last_modified=resp.headers.get("Last-Modified", ""),
+    )
+
+class PersonPageMemo:
+    """
+    Одна загрузка страницы человека на URL за запуск: если разные ФИО
+    привели к одному URL, остальные потоки ждут первый запрос.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pages: dict[str, Future] = {}
+        self.shared = 0  # сколько загрузок страниц сэкономлено
+
+    def fetch(self, url: str, load) -> TatcenterResult:
+        with self._lock:
+            fut = self._pages.get(url)
+            owner = fut is None
+            if owner:
+                fut = self._pages[url] = Future()
+            else:
+                self.shared += 1
+        if owner:
+            try:
+                fut.set_result(load())
+            except Exception as e:
+                fut.set_exception(e)
+        return fut.result()
+
+def lookup_person(
+    client: TatcenterClient,
+    fio: str,
+    url: str | None = None,
+    cached: TatcenterResult | None = None,
+    memo: PersonPageMemo | None = None,
+    candidates=(),
+) -> TatcenterResult:
+    """
+    Поиск + страница человека. Пустой url в результате — человек не найден.
+    Если url уже известен (из кэша) — поиск пропускается.
+    candidates — URL похожих ФИО из локального индекса: страница кандидата
+    принимается, только если ФИО на ней совпадает с искомым; иначе обычный поиск.
+    """
+    if not url:
+        for cand in candidates:
+            res = memo.fetch(cand, lambda: parse_person_page(client, cand)) if memo else parse_person_page(client, cand)
+            if same_fio(res.name, fio):
+                return replace(res, by_candidate=True)
+    if not url:
+        url = search_person_url(client, fio)
+    if not url:
+        return TatcenterResult()
+    cached = cached if (cached and cached.url == url) else None
+    if memo is None:
+        return parse_person_page(client, url, cached)
+    return memo.fetch(url, lambda: parse_person_page(client, url, cached))
+
+def iter_lookups(client: TatcenterClient, items, max_in_flight: int, memo: PersonPageMemo | None = None):
+    """
+    Параллельный lookup_person по items = [(key, fio, known_url | None, cached | None, candidates), ...].
+    Отдаёт (key, fio, result, error) по мере готовности (порядок не сохраняется).
+    Одновременно в работе не больше max_in_flight людей; лимит rps — в client.
+    """
+    max_in_flight = max(1, int(max_in_flight))
+    it = iter(items)
+    pending = {}
+
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="tatcenter") as pool:
+        def submit_next() -> bool:
+            try:
+                key, fio, url, cached, candidates = next(it)
+            except StopIteration:
+                return False
+            pending[pool.submit(lookup_person, client, fio, url, cached, memo, candidates)] = (key, fio)
+            return True
+
+        for _ in range(max_in_flight):
+            if not submit_next():
+                break
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                key, fio = pending.pop(fut)
+                try:
+                    res, err = fut.result(), None
+                except Exception as e:
+                    res, err = None, e
+                submit_next()
+                yield key, fio, res, err
@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import time
+
+from config import CACHE_DIR, TC_CACHE_TTL_FOUND_DAYS, TC_CACHE_TTL_NOT_FOUND_DAYS
+from utils import fio_key, norm_str
+
+DAY = 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search (
+    fio_key    TEXT PRIMARY KEY,
+    fio        TEXT NOT NULL,
+    url        TEXT NOT NULL,
+    checked_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS not_found (
+    fio_key    TEXT PRIMARY KEY,
+    fio        TEXT NOT NULL,
+    checked_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS person (
+    url        TEXT PRIMARY KEY,
+    email      TEXT NOT NULL,
+    dob        TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    etag          TEXT NOT NULL DEFAULT '',
+    last_modified TEXT NOT NULL DEFAULT ''
+);
+"""
+
+def default_cache_path() -> str:
+    return os.path.join(CACHE_DIR, "tatcenter.sqlite3")
+
+class TatcenterCache:
+    """
+    Постоянный кэш Tatcenter (SQLite):
+      search    — ФИО → URL человека;
+      not_found — ФИО, по которым ничего не нашлось (свой, более короткий TTL);
+      person    — URL → e-mail / дата рождения.
+    Записи старше TTL считаются отсутствующими. Не потокобезопасен:
+    работать с ним из одного потока (в контроллере).
+    """
+    def __init__(
+        self,
+        path: str | None = None,
+        ttl_found_days: float = TC_CACHE_TTL_FOUND_DAYS,
+        ttl_not_found_days: float = TC_CACHE_TTL_NOT_FOUND_DAYS,
+    ):
+        self.path = path or default_cache_path()
+        self.ttl_found = ttl_found_days * DAY
+        self.ttl_not_found = ttl_not_found_days * DAY
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self._migrate()
+        self.conn.commit()
+
+    def _migrate(self):
+        # кэш, созданный до условных GET, — без валидаторов
+        cols = {r[1] for r in self.conn.execute("PRAGMA table_info(person)")}
+        for col in ("etag", "last_modified"):
+            if col not in cols:
+                self.conn.execute(f"ALTER TABLE person ADD COLUMN {col} TEXT NOT NULL DEFAULT ''")
+
+    def close(self):
+        try:
+            self.conn.commit()
+        finally:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    def _fresh(self, ts: float, ttl: float) -> bool:
+        return ttl > 0 and (time.time() - ts) < ttl
+
+    # ---- search ----
+    def get_search(self, fio: str) -> str | None:
+        """URL человека; "" — свежий «не найден»; None — нет в кэше или устарело."""
+        key = fio_key(fio)
+        row = self.conn.execute("SELECT url, checked_at FROM search WHERE fio_key = ?", (key,)).fetchone()
+        if row and self._fresh(row[1], self.ttl_found):
+            return row[0]
+        row = self.conn.execute("SELECT checked_at FROM not_found WHERE fio_key = ?", (key,)).fetchone()
+        if row and self._fresh(row[0], self.ttl_not_found):
+            return ""
+        return None
+
+    def put_search(self, fio: str, url: str | None):
+        key = fio_key(fio)
+        now = time.time()
+        if url:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO search (fio_key, fio, url, checked_at) VALUES (?, ?, ?, ?)",
+                (key, norm_str(fio), url, now),
+            )
+            self.conn.execute("DELETE FROM not_found WHERE fio_key = ?", (key,))
+        else:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO not_found (fio_key, fio, checked_at) VALUES (?, ?, ?)",
+                (key, norm_str(fio), now),
+            )
+        self.conn.commit()
+
+    def found_people(self) -> list[tuple[str, str]]:
+        """(ФИО, URL) всех найденных ранее людей — для локального индекса ФИО."""
+        return self.conn.execute(
+            "SELECT s.fio, s.url FROM search s JOIN person p ON p.url = s.url"
+        ).fetchall()
+
+    # ---- person page ----
+    def get_person(self, url: str) -> tuple[str, str] | None:
+        """(email, dob) по URL; None — нет в кэше или устарело."""
+        row = self.conn.execute("SELECT email, dob, fetched_at FROM person WHERE url = ?", (url,)).fetchone()
+        if row and self._fresh(row[2], self.ttl_found):
+            return row[0], row[1]
+        return None
+
+    def get_person_validators(self, url: str) -> tuple[str, str, str, str] | None:
+        """(email, dob, etag, last_modified) без учёта TTL — для условного GET."""
+        row = self.conn.execute(
+            "SELECT email, dob, etag, last_modified FROM person WHERE url = ?", (url,)
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def put_person(self, url: str, email: str | None, dob: str | None, etag: str = "", last_modified: str = ""):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO person (url, email, dob, fetched_at, etag, last_modified) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (url, email or "", dob or "", time.time(), etag or "", last_modified or ""),
+        )
+        self.conn.commit()
@@ -0,0 +1,184 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    HEADERS, TC_RPS, TC_MAX_IN_FLIGHT, TC_TIMEOUT, TC_RETRIES, TC_BACKOFF, TC_BACKOFF_MAX, TC_RETRY_AFTER_MAX,
+)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class TatcenterHTTPError(RuntimeError):
+    pass
+
+class RateLimiter:
+    """
+    Общий (на все потоки) лимит запросов в секунду.
+    Каждый wait() занимает ближайший свободный слот и спит до него.
+    """
+    def __init__(self, rps: float):
+        self.interval = 1.0 / rps if rps and rps > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """Притормозить всех (сервер попросил подождать — 429/Retry-After)."""
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+class LatencyStats:
+    """Задержки и исходы запросов; потокобезопасно."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: list[float] = []
+        self.retries = 0
+        self.failures = 0
+        self.not_modified = 0
+
+    def add(self, seconds: float, status: int):
+        with self._lock:
+            self.samples.append(seconds)
+            if status == 304:
+                self.not_modified += 1
+
+    def add_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def add_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            xs = sorted(self.samples)
+            res = {
+                "requests": len(xs),
+                "retries": self.retries,
+                "failures": self.failures,
+                "not_modified": self.not_modified,
+                "avg_ms": 0, "p50_ms": 0, "p95_ms": 0, "max_ms": 0,
+            }
+            if xs:
+                res["avg_ms"] = round(1000 * sum(xs) / len(xs))
+                res["p50_ms"] = round(1000 * xs[len(xs) // 2])
+                res["p95_ms"] = round(1000 * xs[min(len(xs) - 1, int(len(xs) * 0.95))])
+                res["max_ms"] = round(1000 * xs[-1])
+            return res
+
+def _retry_after_seconds(resp: requests.Response) -> float | None:
+    val = (resp.headers.get("Retry-After") or "").strip()
+    if not val:
+        return None
+    if val.isdigit():
+        return float(val)
+    try:
+        dt = parsedate_to_datetime(val)
+    except Exception:
+        return None
+    return max(0.0, dt.timestamp() - time.time())
+
+class TatcenterClient:
+    """
+    HTTP-слой для tatcenter.ru: один keep-alive пул на все потоки,
+    общий лимит rps, повторы с экспоненциальной паузой и джиттером
+    (5xx/429/обрыв связи, с учётом Retry-After), gzip, условные GET
+    (ETag/Last-Modified) и статистика задержек.
+    """
+    def __init__(
+        self,
+        rps: float = TC_RPS,
+        pool_size: int = TC_MAX_IN_FLIGHT,
+        timeout=TC_TIMEOUT,
+        retries: int = TC_RETRIES,
+        backoff: float = TC_BACKOFF,
+        backoff_max: float = TC_BACKOFF_MAX,
+        retry_after_max: float = TC_RETRY_AFTER_MAX,
+    ):
+        self.timeout = timeout
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+        self.limiter = RateLimiter(rps)
+        self.stats = LatencyStats()
+
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+        # pool_block: лишние потоки ждут соединение, а не открывают одноразовые
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(1, int(pool_size)), pool_block=True, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    def _delay(self, attempt: int) -> float:
+        base = min(self.backoff_max, self.backoff * (2 ** attempt))
+        return base / 2 + random.uniform(0, base / 2)
+
+    def get(self, url: str, etag: str = "", last_modified: str = "") -> requests.Response:
+        """
+        GET с повторами. Возвращает ответ 2xx или 304 (если переданы валидаторы
+        и страница не менялась). Иначе — TatcenterHTTPError.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        last_err = ""
+        for attempt in range(self.retries + 1):
+            self.limiter.wait()
+            t0 = time.perf_counter()
+            try:
+                resp = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last_err = f"{type(e).__name__}: {e}"
+                delay = self._delay(attempt)
+            else:
+                self.stats.add(time.perf_counter() - t0, resp.status_code)
+                if resp.status_code == 304 or resp.ok:
+                    return resp
+                last_err = f"HTTP {resp.status_code}"
+                if resp.status_code not in RETRY_STATUSES:
+                    break
+                delay = self._delay(attempt)
+                ra = _retry_after_seconds(resp)
+                if ra is not None:
+                    # Retry-After — как велит сервер (потолок backoff_max только для своей паузы);
+                    # слишком долгое ожидание — сразу ошибка, повторы не сгорают впустую
+                    if ra > self.retry_after_max:
+                        last_err = f"HTTP {resp.status_code}, сервер просит подождать {ra:.0f} с (Retry-After)"
+                        break
+                    delay = max(delay, ra)
+                if resp.status_code == 429:
+                    self.limiter.pause(delay)
+
+            if attempt < self.retries:
+                self.stats.add_retry()
+                time.sleep(delay)
+
+        self.stats.add_failure()
+        raise TatcenterHTTPError(f"{url}: {last_err}")
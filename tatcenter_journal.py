@@ -0,0 +1,69 @@
+import json
+import os
+import time
+
+from utils import norm_str
+
+JOURNAL_NAME = "tatcenter_journal.jsonl"
+
+class FetchJournal:
+    """
+    Журнал поиска Tatcenter (RESULT/tatcenter_journal.jsonl), только дозапись.
+    Каждая обработанная строка пишется сразу (flush + fsync), поэтому после
+    падения/сна ноутбука найденное не теряется. Первая строка — заголовок с
+    путём к Excel: журнал от другого файла не применяется.
+    Полностью успешный поиск журнал удаляет (finish).
+    """
+    def __init__(self, path: str, excel_path: str):
+        self.path = path
+        self.excel_path = os.path.abspath(excel_path) if excel_path else ""
+        self._fh = None
+
+    def entries(self) -> list[dict]:
+        """Записи прошлого незавершённого запуска для этого же Excel."""
+        if not os.path.exists(self.path):
+            return []
+        out = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            try:
+                head = json.loads(f.readline())
+            except ValueError:
+                return []
+            if head.get("type") != "header" or head.get("excel") != self.excel_path:
+                return []
+            for line in f:
+                try:
+                    out.append(json.loads(line))
+                except ValueError:
+                    continue  # оборванная последняя строка после падения
+        return out
+
+    def open(self, keep: bool):
+        """keep=False — начать журнал заново (старый не от этого Excel или уже применён)."""
+        if not keep and os.path.exists(self.path):
+            os.remove(self.path)
+        new = not os.path.exists(self.path)
+        self._fh = open(self.path, "a", encoding="utf-8")
+        if new:
+            self._write({"type": "header", "excel": self.excel_path, "started": time.time()})
+
+    def _write(self, rec: dict):
+        self._fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def append(self, idx, fio: str, status: str, email: str = "", url: str = "", dob: str = ""):
+        self._write({
+            "idx": int(idx), "fio": norm_str(fio), "status": status,
+            "email": email or "", "url": url or "", "dob": dob or "", "ts": time.time(),
+        })
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def finish(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,110 @@
+import zipfile
+
+from docx import Document
+
+from docx_render import replace_placeholders_docx, iter_story_parts
+from docx_template import CompiledTemplate
+
+MAPPING = {"<<OBRASHENIE>>": "Уважаемая Анна Сергеевна", "<<TEXT>>": "С днём рождения!"}
+
+def split_runs(paragraph, pieces):
+    for piece in pieces:
+        paragraph.add_run(piece)
+
+def make_doc(path):
+    doc = Document()
+    p = doc.add_paragraph()
+    split_runs(p, ["<<OBRA", "SHE", "NIE>>", ", ", "<<TE", "XT>>", " конец"])
+    doc.sections[0].header.paragraphs[0].text = "<<OBRASHENIE>>"
+    comment = doc.add_comment(p.runs[0], text="", author="Отдел")
+    split_runs(comment.paragraphs[0], ["Примечание: <<TE", "XT>>"])
+    doc.save(path)
+    add_notes(path)
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+NOTES = {
+    # имя части: (корневой тег, тег заметки, тип связи, content type)
+    "footnotes": ("footnotes", "footnote", "footnotes", "footnotes"),
+    "endnotes": ("endnotes", "endnote", "endnotes", "endnotes"),
+}
+
+def add_notes(path):
+    """Дописать в .docx сноски и концевые сноски с метками, разрезанными на run'ы (python-docx так не умеет)."""
+    with zipfile.ZipFile(path) as zf:
+        members = {n: zf.read(n) for n in zf.namelist()}
+    rels = members["word/_rels/document.xml.rels"].decode()
+    types = members["[Content_Types].xml"].decode()
+    for i, (name, (root, tag, rel, ct)) in enumerate(NOTES.items()):
+        members[f"word/{name}.xml"] = (
+            f'<w:{root} xmlns:w="{W_NS}"><w:{tag} w:id="1"><w:p>'
+            f'<w:r><w:t xml:space="preserve">{name}: &lt;&lt;TE</w:t></w:r><w:r><w:t>XT&gt;&gt;</w:t></w:r>'
+            f'</w:p></w:{tag}></w:{root}>'
+        ).encode()
+        rels = rels.replace("</Relationships>", (
+            f'<Relationship Id="rIdNote{i}" Target="{name}.xml" '
+            f'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/{rel}"/></Relationships>'
+        ))
+        types = types.replace("</Types>", (
+            f'<Override PartName="/word/{name}.xml" '
+            f'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.{ct}+xml"/></Types>'
+        ))
+    members["word/_rels/document.xml.rels"] = rels.encode()
+    members["[Content_Types].xml"] = types.encode()
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for n, data in members.items():
+            zf.writestr(n, data)
+
+def note_texts(path):
+    out = []
+    with zipfile.ZipFile(path) as zf:
+        for name in NOTES:
+            xml = zf.read(f"word/{name}.xml").decode()
+            out.append(xml.count("С днём рождения!") == 1 and "&lt;&lt;" not in xml and "TE<" not in xml)
+    return out
+
+def texts(doc):
+    body = [p.text for p in doc.paragraphs if p.text]
+    header = doc.sections[0].header.paragraphs[0].text
+    comments = [c.paragraphs[0].text for c in doc.comments]
+    return body, header, comments
+
+EXPECTED = (
+    ["Уважаемая Анна Сергеевна, С днём рождения! конец"],
+    "Уважаемая Анна Сергеевна",
+    ["Примечание: С днём рождения!"],
+)
+
+def test_story_parts_include_comments(tmp_path):
+    path = tmp_path / "t.docx"
+    make_doc(path)
+    names = {str(p.partname) for p in iter_story_parts(Document(path))}
+    assert {
+        "/word/document.xml", "/word/header1.xml", "/word/comments.xml", "/word/footnotes.xml", "/word/endnotes.xml",
+    } <= names
+
+def test_replace_all_parts(tmp_path):
+    path = tmp_path / "t.docx"
+    make_doc(path)
+    doc = Document(path)
+    replace_placeholders_docx(doc, MAPPING)
+    assert texts(doc) == EXPECTED
+    out = tmp_path / "out.docx"
+    doc.save(out)
+    assert note_texts(out) == [True, True]
+
+def test_compiled_template_all_parts(tmp_path):
+    path = tmp_path / "t.docx"
+    make_doc(path)
+    out = tmp_path / "out.docx"
+    CompiledTemplate(str(path)).save(str(out), MAPPING)
+    assert texts(Document(out)) == EXPECTED
+    assert note_texts(out) == [True, True]
+
+def test_compiled_template_without_zip_copy(tmp_path):
+    path = tmp_path / "t.docx"
+    make_doc(path)
+    tpl = CompiledTemplate(str(path), zip_copy=False)
+    for name in ("a.docx", "b.docx"):  # второй раз — после восстановления частей шаблона
+        tpl.save(str(tmp_path / name), MAPPING)
+        assert texts(Document(tmp_path / name)) == EXPECTED
+        assert note_texts(tmp_path / name) == [True, True]
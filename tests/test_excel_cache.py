@@ -0,0 +1,26 @@
+import os
+
+import pandas as pd
+
+import excel_loader
+
+def test_cache_roundtrip_and_broken_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(excel_loader, "EXCEL_CACHE_DIR", str(tmp_path / "cache"))
+    book = tmp_path / "book.xlsx"
+    book.write_bytes(b"not really excel, only hashed")
+    df = pd.DataFrame({"Фамилия": ["Иванов"], "Отправлять": [True]})
+
+    cached, sha = excel_loader.load_cached(str(book))
+    assert cached is None
+    excel_loader.save_cached(str(book), sha, df)
+    cached, sha2 = excel_loader.load_cached(str(book))
+    assert sha2 == sha
+    pd.testing.assert_frame_equal(cached, df)
+
+    # файл кэша, который не читается (другая версия pandas, обрыв записи), — промах, а не ошибка
+    path = excel_loader._cache_path(sha)
+    if path.endswith(".pkl"):
+        assert pd.__version__ in os.path.basename(path)
+    with open(path, "wb") as f:
+        f.write(b"garbage")
+    assert excel_loader.load_cached(str(book))[0] is None
@@ -0,0 +1,65 @@
+import os
+
+import tatcenter
+from fio_index import FioIndex, same_fio
+from tatcenter import TatcenterResult, lookup_person
+
+PEOPLE = [
+    ("Гарипов Ильдар Ринатович", "/person/garipov-ildar/"),
+    ("Хабибуллина Алия Рустемовна", "/person/habibullina-aliya/"),
+    ("Пётров Иван Иванович", "/person/petrov-ivan/"),
+]
+
+def test_best_only_same_words():
+    index = FioIndex.from_pairs(PEOPLE)
+    assert index.best("иван ПЕТРОВ иванович") == "/person/petrov-ivan/"
+    assert index.best("Гарипов Ильнар Ринатович") is None
+    assert index.best("Хабибуллина Алия Рустамовна") is None
+
+def test_candidates_ranked_within_one_typo_per_word():
+    index = FioIndex.from_pairs(PEOPLE + [("Гарипова Ильдара Ринатовна", "/person/garipova/")])
+    assert index.candidates("Гарипов Ильнар Ринатович")[0] == "/person/garipov-ildar/"
+    assert index.candidates("Хабибуллина Алия Рустамовна") == ["/person/habibullina-aliya/"]
+    assert index.candidates("Сидоров Пётр") == []
+
+def test_same_fio():
+    assert same_fio("Ёлкин Пётр", "петр елкин")
+    assert not same_fio("Гарипов Ильнар", "Гарипов Ильдар")
+    assert not same_fio("", "")
+
+def stub_site(monkeypatch, pages: dict, search_url):
+    calls = []
+
+    def page(_client, url, cached=None):
+        calls.append(("page", url))
+        return TatcenterResult(email=f"{url}@example.org", url=url, name=pages[url])
+
+    def search(_client, fio):
+        calls.append(("search", fio))
+        return search_url
+
+    monkeypatch.setattr(tatcenter, "parse_person_page", page)
+    monkeypatch.setattr(tatcenter, "search_person_url", search)
+    return calls
+
+def test_candidate_with_other_name_on_page_is_rejected(monkeypatch):
+    pages = {"/person/garipov-ildar/": "Гарипов Ильдар Ринатович", "/person/garipov-ilnar/": "Гарипов Ильнар Ринатович"}
+    calls = stub_site(monkeypatch, pages, "/person/garipov-ilnar/")
+    res = lookup_person(None, "Гарипов Ильнар Ринатович", candidates=["/person/garipov-ildar/"])
+    assert res.url == "/person/garipov-ilnar/" and not res.by_candidate
+    assert ("search", "Гарипов Ильнар Ринатович") in calls
+
+def test_candidate_confirmed_by_page_skips_search(monkeypatch):
+    # в кэше ФИО с опечаткой, на странице — ровно искомое
+    pages = {"/person/garipov-ildar/": "Гарипов Ильдар Ринатович"}
+    calls = stub_site(monkeypatch, pages, None)
+    res = lookup_person(None, "Ринатович Ильдар Гарипов", candidates=["/person/garipov-ildar/"])
+    assert res.url == "/person/garipov-ildar/" and res.by_candidate
+    assert calls == [("page", "/person/garipov-ildar/")]
+
+def test_person_name_from_page():
+    path = os.path.join(os.path.dirname(__file__), "fixtures", "tatcenter", "person_mailto.html")
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+    assert tatcenter.extract_person_name(html) == "Иванова Анна Сергеевна"
+    assert tatcenter._person_name_bs4(html) == "Иванова Анна Сергеевна"
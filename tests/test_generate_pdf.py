@@ -0,0 +1,37 @@
+import pandas as pd
+
+import controller
+from controller import AppController
+from manifest import BuildManifest, MANIFEST_NAME
+from model import DataModel
+
+def fake_convert(jobs, on_doc, backend):
+    for key, _docx, pdf in jobs:
+        with open(pdf, "wb") as f:
+            f.write(b"%PDF-1.4 fake")
+        on_doc(key, None)
+
+def test_rows_sharing_a_pdf_count_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(controller, "pick_backend", lambda: "stub")
+    monkeypatch.setattr(controller, "convert_batch", fake_convert)
+    m = DataModel()
+    m.state.project_dir = str(tmp_path)
+    # Иванов Иван Иванович и Иванов Игорь Ильич — оба «Иванов И.И.»
+    m.df = pd.DataFrame({
+        "Фамилия": ["Иванов", "Иванов", "Петров"],
+        "Имя": ["Иван", "Игорь", "Пётр"],
+        "Отчество": ["Иванович", "Ильич", "Петрович"],
+    }, dtype="str")
+    man = BuildManifest(m.result_dir(MANIFEST_NAME))
+    for idx in m.df.index:
+        path = m.docx_path_for_idx(idx)
+        with open(path, "wb") as f:
+            f.write(b"docx")
+        man.record("docx", path, f"h{path}")
+    man.save()
+    c = AppController(m)
+
+    first = c.generate_pdf()
+    assert (first["built"], first["skipped"], first["errors"]) == (2, 0, 0)
+    again = c.generate_pdf()
+    assert (again["built"], again["skipped"], again["errors"]) == (0, 2, 0)
@@ -0,0 +1,64 @@
+import re
+
+import pandas as pd
+from hypothesis import given, settings, strategies as st
+
+import model
+from model import norm_column
+from utils import norm_str
+
+def norm_str_old(s) -> str:
+    """norm_str до векторизации (эталон)."""
+    if s is None:
+        return ""
+    s = str(s).replace("\u00A0", " ")
+    s = s.strip()
+    s = re.sub(r"\s+", " ", s)
+    s = s.replace("Ё", "Е").replace("ё", "е")
+    return s
+
+# все пробельные символы Unicode + то, что рядом с ними путают
+WHITESPACE = [chr(c) for c in range(0x110000) if chr(c).isspace()]
+TRICKY = WHITESPACE + ["Ё", "ё", "Е", "е", "\u200b", "\ufeff", "a", "Я", "1", "@", "."]
+
+texts = st.text(alphabet=st.sampled_from(TRICKY) | st.characters(), max_size=30)
+values = texts | st.none() | st.integers() | st.floats() | st.booleans()
+
+@given(values)
+@settings(max_examples=3000)
+def test_norm_str_matches_old(v):
+    assert norm_str(v) == norm_str_old(v)
+
+def test_whitespace_is_regex_whitespace():
+    # на этом держится norm_str: split() режет ровно по \s
+    for c in range(0x110000):
+        ch = chr(c)
+        assert ch.isspace() == (re.fullmatch(r"\s", ch) is not None), hex(c)
+
+@given(st.lists(texts | st.none(), max_size=50))
+def test_norm_column_string_dtype(vals):
+    s = pd.Series(vals, dtype="str")
+    pd.testing.assert_series_equal(norm_column(s), s.apply(norm_str_old).astype("str"))
+
+@given(st.lists(values, max_size=50))
+def test_norm_column_object_dtype(vals):
+    # 1, 1.0 и True здесь разные значения: нормализуется каждое само по себе
+    s = pd.Series(vals, dtype=object)
+    expected = pd.Series([norm_str_old(v) for v in vals], index=s.index, dtype="str")
+    pd.testing.assert_series_equal(norm_column(s), expected)
+
+@given(st.lists(texts | st.none() | st.just(float("nan")), max_size=50))
+def test_norm_column_object_strings(vals):
+    # так колонки приходят из read_excel(dtype=str) в pandas 2.x
+    s = pd.Series(vals, dtype=object)
+    expected = pd.Series([norm_str_old(v) for v in vals], index=s.index, dtype="str")
+    pd.testing.assert_series_equal(norm_column(s), expected)
+
+def test_object_string_column_takes_fast_path(monkeypatch):
+    calls = []
+    monkeypatch.setattr(model, "norm_str", lambda v: calls.append(v) or norm_str_old(v))
+    s = pd.Series(["Иванов ", "Пётров", "Иванов "] * 1000 + [None, float("nan")], dtype=object)
+    out = norm_column(s)
+    assert len(calls) == 4  # две различные строки + два пропуска, а не 3002 вызова
+    assert out.iloc[0] == "Иванов" and out.iloc[1] == "Петров"
+    assert out.iloc[-2] == "" and out.iloc[-1] == "nan"
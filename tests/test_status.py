@@ -0,0 +1,41 @@
+import pandas as pd
+from hypothesis import given, settings, strategies as st
+
+from model import DataModel, status_frame
+
+WS = [" ", "\u00A0", "\t", "\n", "\u2003"]
+genders = st.sampled_from(["Муж", "Жен", "", "муж", "Муж.", "Ж"]) | st.builds(
+    lambda a, g, b: a + g + b, st.sampled_from(WS), st.sampled_from(["Муж", "Жен"]), st.sampled_from(WS)
+)
+email_parts = st.sampled_from(["a", "ivan.petrov", "ё", "x y", "", "@", ".", ",", ";", "(", ":", "<", "ru", "mail"] + WS)
+emails = st.lists(email_parts, max_size=8).map("".join) | st.builds(
+    lambda a, b, c: f"{a}@{b}.{c}", email_parts, email_parts, email_parts
+) | st.none()
+
+def frame(rows):
+    return pd.DataFrame(
+        {"Пол (итог)": [g for g, _e in rows], "E-mail": [e for _g, e in rows]},
+        index=[i * 3 + 1 for i in range(len(rows))],
+        dtype="str",
+    )
+
+@given(st.lists(st.tuples(genders, emails), max_size=40))
+@settings(max_examples=300)
+def test_status_frame_matches_compute_status_row(rows):
+    df = frame(rows)
+    m = DataModel()
+    st_df = status_frame(df)
+    for idx, row in df.iterrows():
+        assert tuple(st_df.loc[idx]) == m.compute_status_row(row)
+
+@given(st.lists(st.tuples(genders, emails), min_size=1, max_size=30), st.data())
+@settings(max_examples=100)
+def test_refresh_status_rows_matches_full(rows, data):
+    m = DataModel()
+    m.df = frame(rows)
+    m.refresh_status()
+    idx = data.draw(st.sampled_from(list(m.df.index)))
+    m.df.at[idx, "Пол (итог)"] = data.draw(genders)
+    m.df.at[idx, "E-mail"] = data.draw(emails.filter(lambda e: e is not None))
+    m.refresh_status([idx])
+    pd.testing.assert_frame_equal(m.status, status_frame(m.df))
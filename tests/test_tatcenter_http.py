@@ -0,0 +1,43 @@
+import pytest
+import requests
+
+import tatcenter_http
+from tatcenter_http import TatcenterClient, TatcenterHTTPError
+
+def response(status: int, retry_after: str = "") -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = status
+    if retry_after:
+        resp.headers["Retry-After"] = retry_after
+    return resp
+
+@pytest.fixture
+def client(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(tatcenter_http.time, "sleep", sleeps.append)
+    c = TatcenterClient(rps=0, retries=2, backoff=1.0, backoff_max=60.0, retry_after_max=600.0)
+    c.limiter.pause = lambda _s: None
+    c.sleeps = sleeps
+    yield c
+    c.close()
+
+def serve(client, monkeypatch, responses):
+    it = iter(responses)
+    monkeypatch.setattr(client.session, "get", lambda *a, **k: next(it))
+
+def test_retry_after_longer_than_backoff_max_is_honored(client, monkeypatch):
+    serve(client, monkeypatch, [response(429, "300"), response(200)])
+    assert client.get("https://example.org/").status_code == 200
+    assert client.sleeps == [300.0]
+
+def test_too_long_retry_after_fails_fast(client, monkeypatch):
+    serve(client, monkeypatch, [response(429, "3600"), response(200)])
+    with pytest.raises(TatcenterHTTPError, match="Retry-After"):
+        client.get("https://example.org/")
+    assert client.sleeps == []
+
+def test_own_backoff_is_capped(client, monkeypatch):
+    client.backoff = 1000.0
+    serve(client, monkeypatch, [response(503), response(200)])
+    assert client.get("https://example.org/").status_code == 200
+    assert len(client.sleeps) == 1 and client.sleeps[0] <= 60.0
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+import tatcenter
+from config import BASE_URL
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "tatcenter")
+
+def page(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+SEARCH = {
+    "search_person.html": BASE_URL + "/person/ivanova-anna-sergeevna/",
+    "search_person_spaces.html": BASE_URL + "/person/petrov-ivan/",
+    "search_person_link_only.html": "https://tatcenter.ru/person/sidorov-petr/",
+    "search_empty.html": None,
+    "search_no_container.html": None,
+}
+
+PERSON = {
+    "person_mailto.html": ("a.ivanova@example.org", "12 марта 1975"),
+    "person_email_text.html": ("ivan.petrov@example.org", "1 января 1960 г."),
+    "person_no_email.html": (None, "5 мая 1980"),
+    "person_bad_email.html": (None, None),
+    "person_no_fields.html": (None, None),
+}
+
+@pytest.mark.parametrize("name", sorted(SEARCH))
+def test_person_url_lxml_equals_bs4(name):
+    html = page(name)
+    fast = tatcenter._person_url_lxml(html)
+    if fast is not tatcenter._NO_RESULT:
+        assert fast == tatcenter._person_url_bs4(html)
+    assert tatcenter.extract_person_url(html) == SEARCH[name]
+
+def test_no_container_falls_back_to_bs4():
+    html = page("search_no_container.html")
+    assert tatcenter._person_url_lxml(html) is tatcenter._NO_RESULT
+    assert tatcenter.extract_person_url(html) == tatcenter._person_url_bs4(html)
+
+@pytest.mark.parametrize("name", sorted(PERSON))
+def test_person_info_lxml_equals_bs4(name):
+    html = page(name)
+    fast = tatcenter._person_info_lxml(html)
+    if fast is not tatcenter._NO_RESULT:
+        assert fast == tatcenter._person_info_bs4(html)
+    assert tatcenter.extract_person_info(html) == PERSON[name]
+
+def test_no_span_bold_falls_back_to_bs4():
+    html = page("person_no_fields.html")
+    assert tatcenter._person_info_lxml(html) is tatcenter._NO_RESULT
+    assert tatcenter.extract_person_info(html) == (None, None)
+
+def test_without_lxml(monkeypatch):
+    monkeypatch.setattr(tatcenter, "lxml_html", None)
+    for name, expected in SEARCH.items():
+        assert tatcenter.extract_person_url(page(name)) == expected
+    for name, expected in PERSON.items():
+        assert tatcenter.extract_person_info(page(name)) == expected
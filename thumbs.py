@@ -0,0 +1,74 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+
+from config import THUMB_WIDTH, THUMB_PROCESSES
+
+def thumb_path(preview_dir: str, pdf_path: str, width: int = THUMB_WIDTH) -> str:
+    """RESULT/PREVIEW/<имя PDF>_w<ширина>.png"""
+    stem = os.path.splitext(os.path.basename(pdf_path))[0]
+    return os.path.join(preview_dir, f"{stem}_w{width}.png")
+
+def thumb_fresh(pdf_path: str, png_path: str) -> bool:
+    """Миниатюра актуальна, если её mtime равен mtime PDF (render_thumb ставит его сам)."""
+    try:
+        return os.stat(png_path).st_mtime_ns == os.stat(pdf_path).st_mtime_ns
+    except OSError:
+        return False
+
+def render_thumb(pdf_path: str, png_path: str, width: int = THUMB_WIDTH) -> str:
+    """Первая страница PDF → PNG шириной width (выполняется в процессе пула)."""
+    st = os.stat(pdf_path)
+    doc = fitz.open(pdf_path)
+    try:
+        page = doc.load_page(0)
+        scale = width / max(1.0, page.rect.width)
+        pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+        tmp = png_path + ".tmp"
+        pix.save(tmp, output="png")
+    finally:
+        doc.close()
+    os.replace(tmp, png_path)
+    os.utime(png_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    return png_path
+
+class ThumbnailPool:
+    """
+    Фоновая отрисовка миниатюр в процессах. want() задаёт, что нужно сейчас
+    (видимая часть сетки): новое ставится в очередь, не начатое и уже
+    ненужное снимается. done() — готовые результаты, для потока Tk.
+    """
+    def __init__(self, processes: int = THUMB_PROCESSES, width: int = THUMB_WIDTH):
+        self.width = width
+        self._pool = ProcessPoolExecutor(max_workers=max(1, int(processes)))
+        self._pending: dict = {}  # key -> (future, png)
+
+    def want(self, jobs: list[tuple]):
+        """jobs = [(key, pdf_path, png_path), ...]"""
+        keys = {key for key, _pdf, _png in jobs}
+        for key in [k for k in self._pending if k not in keys]:
+            fut, _png = self._pending[key]
+            if fut.cancel():
+                del self._pending[key]
+        for key, pdf, png in jobs:
+            if key not in self._pending:
+                self._pending[key] = (self._pool.submit(render_thumb, pdf, png, self.width), png)
+
+    def busy(self) -> bool:
+        return bool(self._pending)
+
+    def done(self) -> list[tuple]:
+        """[(key, png_path, error | None), ...] для завершившихся задач."""
+        out = []
+        for key in [k for k, (f, _p) in self._pending.items() if f.done()]:
+            fut, png = self._pending.pop(key)
+            if fut.cancelled():
+                continue
+            err = fut.exception()
+            out.append((key, png, (str(err) or err.__class__.__name__) if err else None))
+        return out
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pending.clear()
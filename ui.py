@@ -3,11 +3,15 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import tkinter.font as tkfont
 
-from config import WIN
-from model import DataModel
+from PIL import ImageTk
+
+from config import WIN, PREVIEW_PREFETCH, THUMB_WIDTH, SEARCH_DEBOUNCE_MS
+from model import DataModel, STATUS_OK
 from controller import AppController
-from utils import norm_str, is_email_like, toggle_gender
-from preview import render_pdf_page_to_photoimage
+from utils import norm_str, toggle_gender
+from preview import PreviewCache, PreviewRenderer
+from thumbs import ThumbnailPool, thumb_path, thumb_fresh
+from table_view import VirtualTable
 
 
 PAD = 12
@@ -43,6 +47,132 @@ class ProgressDialog(tk.Toplevel):
         self.update()
 
 
+class ContactSheet(tk.Toplevel):
+    """
+    Сетка миниатюр PDF текущего вида таблицы. Рисуются только видимые ячейки
+    (+ строка запаса); миниатюры лежат в RESULT/PREVIEW и пересоздаются
+    в фоне, когда PDF новее. Двойной клик — выбрать строку в таблице.
+    """
+    CAPTION_H = 20
+    GAP = 10
+
+    def __init__(self, master, entries: list[tuple], preview_dir: str, on_pick):
+        super().__init__(master)
+        self.title(f"Миниатюры — {len(entries)}")
+        self.geometry("1100x800")
+        self.entries = entries  # [(idx, подпись, pdf_path), ...]
+        self.preview_dir = preview_dir
+        self.on_pick = on_pick
+        self.pool = ThumbnailPool()
+        self.cell_w = THUMB_WIDTH + self.GAP
+        self.cell_h = int(THUMB_WIDTH * 1.45) + self.CAPTION_H + self.GAP
+        self.cols = 1
+        self.photos: dict[int, ImageTk.PhotoImage] = {}
+        self._poll_id = None
+        self._redraw_id = None
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        self.canvas = tk.Canvas(self, bg="#eef1f6", highlightthickness=0)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        sb = ttk.Scrollbar(self, orient="vertical", command=self._yview)
+        sb.grid(row=0, column=1, sticky="ns")
+        self.canvas.configure(yscrollcommand=sb.set)
+
+        self.canvas.bind("<Configure>", lambda _e: self._schedule_redraw())
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda _e: self._yview("scroll", -1, "units"))
+        self.canvas.bind("<Button-5>", lambda _e: self._yview("scroll", 1, "units"))
+        self.canvas.bind("<Double-1>", self._on_double)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self._schedule_redraw()
+
+    def _on_wheel(self, event):
+        self._yview("scroll", int(-event.delta / 120) or (-1 if event.delta > 0 else 1), "units")
+
+    def _schedule_redraw(self):
+        if self._redraw_id is None:
+            self._redraw_id = self.after(30, self._redraw)
+
+    def _visible(self) -> range:
+        top = self.canvas.canvasy(0)
+        bottom = self.canvas.canvasy(self.canvas.winfo_height())
+        first = max(0, int(top // self.cell_h) - 1) * self.cols
+        last = (int(bottom // self.cell_h) + 2) * self.cols
+        return range(first, min(last, len(self.entries)))
+
+    def _redraw(self):
+        self._redraw_id = None
+        width = max(1, self.canvas.winfo_width())
+        self.cols = max(1, width // self.cell_w)
+        rows = -(-len(self.entries) // self.cols)
+        self.canvas.configure(scrollregion=(0, 0, width, rows * self.cell_h), yscrollincrement=self.cell_h // 4)
+
+        visible = self._visible()
+        self.canvas.delete("all")
+        for i in [i for i in self.photos if i not in visible]:
+            del self.photos[i]  # картинки вне экрана не держим
+
+        jobs = []
+        for i in visible:
+            idx, label, pdf = self.entries[i]
+            x = (i % self.cols) * self.cell_w + self.GAP // 2
+            y = (i // self.cols) * self.cell_h + self.GAP // 2
+            png = thumb_path(self.preview_dir, pdf)
+            photo = self.photos.get(i)
+            if photo is None and os.path.exists(pdf) and thumb_fresh(pdf, png):
+                try:
+                    photo = self.photos[i] = ImageTk.PhotoImage(file=png)
+                except Exception:
+                    photo = None
+            if photo is not None:
+                self.canvas.create_image(x, y, image=photo, anchor="nw")
+            else:
+                self.canvas.create_rectangle(
+                    x, y, x + THUMB_WIDTH, y + self.cell_h - self.CAPTION_H - self.GAP, outline="#d1d5db", fill="#ffffff"
+                )
+                if os.path.exists(pdf):
+                    jobs.append((i, pdf, png))
+                else:
+                    self.canvas.create_text(x + THUMB_WIDTH // 2, y + 40, text="нет PDF", fill="#9ca3af")
+            self.canvas.create_text(
+                x, y + self.cell_h - self.CAPTION_H - self.GAP + 2, text=label, anchor="nw",
+                fill="#374151", width=THUMB_WIDTH,
+            )
+
+        self.pool.want(jobs)
+        if self.pool.busy() and self._poll_id is None:
+            self._poll_id = self.after(80, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        visible = self._visible()
+        if any(key in visible and err is None for key, _png, err in self.pool.done()):
+            self._schedule_redraw()
+        if self.pool.busy():
+            self._poll_id = self.after(80, self._poll)
+
+    def _on_double(self, event):
+        col = int(self.canvas.canvasx(event.x) // self.cell_w)
+        row = int(self.canvas.canvasy(event.y) // self.cell_h)
+        i = row * self.cols + col
+        if col < self.cols and 0 <= i < len(self.entries):
+            self.on_pick(self.entries[i][0])
+
+    def close(self):
+        for aid in (self._poll_id, self._redraw_id):
+            if aid is not None:
+                try:
+                    self.after_cancel(aid)
+                except Exception:
+                    pass
+        self.pool.close()
+        self.destroy()
+
+
 class PostcardApp(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -65,11 +195,20 @@ class PostcardApp(tk.Tk):
         self._edit_widget = None
         self.pdf_cache_imgtk = None
         self._preview_after_id = None
+        self.preview_cache = PreviewCache()
+        self.preview_renderer = PreviewRenderer(self.preview_cache)
+        self._preview_poll_id = None
+        self._status_after_id = None
+        self._search_after_id = None
+        self._preview_ctx = None
+
+        self._accounts_poll_id = None
 
         self._build_styles()
         self._build_ui()
         self._refresh_everything()
         self.refresh_table()
+        self._load_accounts()
 
     # -------------------------
     # Styles
@@ -165,7 +304,7 @@ class PostcardApp(tk.Tk):
         top.grid_columnconfigure(1, weight=1)
 
         ttk.Label(top, text="Проект", style="CardTitle.TLabel").grid(row=0, column=0, sticky="w")
-        ttk.Label(top, text="Excel / шаблон DOCX / папка RESULT", style="CardSub.TLabel").grid(
+        ttk.Label(top, text="Excel / шаблон DOCX или PDF / папка RESULT", style="CardSub.TLabel").grid(
             row=0, column=1, sticky="w", padx=(10, 0)
         )
 
@@ -234,7 +373,7 @@ class PostcardApp(tk.Tk):
 
         self.filter_var = tk.StringVar(value="all")
         self.search_var = tk.StringVar()
-        self.search_var.trace_add("write", lambda *_: self.refresh_table())
+        self.search_var.trace_add("write", lambda *_: self._schedule_search())
 
         # Чипы фильтра
         self._chip_buttons = {}
@@ -255,7 +394,7 @@ class PostcardApp(tk.Tk):
         add_chip("Без e-mail", "no_email", 3)
         add_chip("Отмеченные", "checked", 4)
 
-        ttk.Label(filt, text="Поиск фамилии:").grid(row=0, column=8, sticky="e", padx=(16, 6))
+        ttk.Label(filt, text="Поиск (фамилия, имя, e-mail):").grid(row=0, column=8, sticky="e", padx=(16, 6))
         ttk.Entry(filt, textvariable=self.search_var, width=24).grid(row=0, column=9, sticky="e")
 
         right_tools = ttk.Frame(filt, style="Card.TFrame")
@@ -302,8 +441,8 @@ class PostcardApp(tk.Tk):
 
         self.tree.grid(row=0, column=0, sticky="nsew")
 
-        sb = ttk.Scrollbar(table_wrap, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=sb.set)
+        # вертикаль — своя: дерево держит только видимое окно строк (VirtualTable)
+        sb = ttk.Scrollbar(table_wrap, orient="vertical")
         sb.grid(row=0, column=1, sticky="ns")
 
         hsb = ttk.Scrollbar(table_wrap, orient="horizontal", command=self.tree.xview)
@@ -319,13 +458,16 @@ class PostcardApp(tk.Tk):
 
         self.tree.bind("<Button-1>", self.on_tree_click)
         self.tree.bind("<Double-1>", self.on_tree_double_click)
-        self.tree.bind("<<TreeviewSelect>>", lambda _e: self.refresh_preview())
+        self.table = VirtualTable(self.tree, sb, self._row_view)
+        self.tree.bind("<<TableSelect>>", lambda _e: self.refresh_preview())
 
         # RIGHT: preview
         right.grid_columnconfigure(0, weight=1)
         right.grid_rowconfigure(2, weight=1)
 
         ttk.Label(right, text="Предпросмотр", style="CardTitle.TLabel").grid(row=0, column=0, sticky="w")
+        self.btn_thumbs = ttk.Button(right, text="🖼 Миниатюры", command=self.open_contact_sheet)
+        self.btn_thumbs.grid(row=0, column=0, sticky="e")
 
         self.preview_title = ttk.Label(right, text="—", style="CardSub.TLabel")
         self.preview_title.grid(row=1, column=0, sticky="w", pady=(8, 6))
@@ -382,7 +524,13 @@ class PostcardApp(tk.Tk):
         self.btn_open.grid(row=0, column=5, padx=(0, 10), pady=(0, 8), sticky="w")
 
         self.btn_export = ttk.Button(btnrow, text="⬇ Выгрузить PDF…", style="Big.TButton", command=self.export_pdf)
-        self.btn_export.grid(row=0, column=6, pady=(0, 8), sticky="w")
+        self.btn_export.grid(row=0, column=6, padx=(0, 10), pady=(0, 8), sticky="w")
+
+        self.btn_print = ttk.Button(btnrow, text="🖨 PDF для печати…", style="Big.TButton", command=self.merge_print_pdf)
+        self.btn_print.grid(row=0, column=7, padx=(0, 10), pady=(0, 8), sticky="w")
+
+        self.btn_optimize = ttk.Button(btnrow, text="🗜 Сжать PDF", style="Big.TButton", command=self.optimize_pdfs)
+        self.btn_optimize.grid(row=0, column=8, pady=(0, 8), sticky="w")
 
         out = ttk.Frame(bottom, style="Card.TFrame", padding=12)
         out.grid(row=1, column=0, sticky="ew", pady=(10, 0))
@@ -392,7 +540,9 @@ class PostcardApp(tk.Tk):
 
         ttk.Label(out, text="Отправлять с:").grid(row=1, column=0, sticky="w", pady=(10, 0))
         self.sender_var = tk.StringVar(value=self.model.state.sender_email)
-        self.sender_combo = ttk.Combobox(out, textvariable=self.sender_var, width=45, state="normal")
+        self.sender_combo = ttk.Combobox(
+            out, textvariable=self.sender_var, width=45, state="normal", postcommand=self._load_accounts,
+        )
         self.sender_combo.grid(row=1, column=1, sticky="w", padx=(8, 14), pady=(10, 0))
 
         ttk.Label(out, text="Тема:").grid(row=1, column=2, sticky="w", pady=(10, 0))
@@ -453,7 +603,10 @@ class PostcardApp(tk.Tk):
             messagebox.showerror("Excel", str(e))
 
     def load_template(self):
-        path = filedialog.askopenfilename(title="Выберите шаблон DOCX", filetypes=[("Word", "*.docx")])
+        path = filedialog.askopenfilename(
+            title="Выберите шаблон (DOCX или PDF)",
+            filetypes=[("Шаблон", "*.docx *.pdf"), ("Word", "*.docx"), ("PDF", "*.pdf")],
+        )
         if not path:
             return
         self.ctrl.load_template(path)
@@ -472,60 +625,90 @@ class PostcardApp(tk.Tk):
     # -------------------------
     # Table
     # -------------------------
+    def _schedule_search(self):
+        """Поиск — после паузы в наборе, а не на каждую букву."""
+        if self._search_after_id is not None:
+            try:
+                self.after_cancel(self._search_after_id)
+            except Exception:
+                pass
+        self._search_after_id = self.after(SEARCH_DEBOUNCE_MS, self.refresh_table)
+
     def refresh_table(self):
-        self.tree.delete(*self.tree.get_children())
+        """Пересчитать набор строк (фильтр/поиск). Правка одной строки — update_row()."""
+        if self._search_after_id is not None:
+            try:
+                self.after_cancel(self._search_after_id)
+            except Exception:
+                pass
+            self._search_after_id = None
         if self.model.df is None:
             self.view_idx = []
+            self.table.set_rows([])
             return
 
-        df = self.model.df.copy()
+        df = self.model.df
+        if self.model.status is None:
+            self.model.refresh_status()
+        st = self.model.status
 
         f = self.filter_var.get()
         if f == "problems":
-            df = df[df.apply(lambda r: self.model.compute_status_row(r)[2] != "ОК", axis=1)]
+            df = df[st["status"] != STATUS_OK]
         elif f == "no_gender":
-            df = df[df["Пол (итог)"].apply(norm_str) == ""]
+            df = df[~st["gender_ok"]]
         elif f == "no_email":
-            df = df[~df["E-mail"].apply(lambda x: is_email_like(norm_str(x)))]
+            df = df[~st["email_ok"]]
         elif f == "checked":
             df = df[df["Отправлять"] == True]  # noqa
 
-        q = norm_str(self.search_var.get()).lower()
-        if q:
-            df = df[df["Фамилия"].apply(lambda x: norm_str(x).lower().startswith(q))]
+        found = self.model.search_rows(self.search_var.get())
+        if found is not None:
+            df = df[df.index.isin(found)]
 
         self.view_idx = list(df.index)
+        self.table.set_rows(self.view_idx)
+        if self.view_idx:
+            self.table.select(self.view_idx[0], notify=False)
 
-        for i, idx in enumerate(self.view_idx):
-            row = self.model.df.loc[idx]
-            g_ok, e_ok, status = self.model.compute_status_row(row)
-
-            values = [
-                "✓" if bool(row.get("Отправлять", True)) else "",
-                row["Фамилия"], row["Имя"], row["Отчество"],
-                row["Пол (итог)"], row["E-mail"], status,
-            ]
+        self.refresh_preview()
+        self._refresh_everything()
 
-            zebra = "zebra0" if (i % 2 == 0) else "zebra1"
-            tags = [zebra]
+    def _row_view(self, idx: int, pos: int):
+        """Значения и теги строки таблицы (pos — место в текущем наборе, для зебры)."""
+        row = self.model.df.loc[idx]
+        g_ok, e_ok, status = self.model.status_of(idx)
 
-            if status == "ОК":
-                tags.append("ok")
-            else:
-                if not g_ok:
-                    tags.append("bad_gender")
-                if not e_ok:
-                    tags.append("bad_email")
+        values = [
+            "✓" if bool(row.get("Отправлять", True)) else "",
+            row["Фамилия"], row["Имя"], row["Отчество"],
+            row["Пол (итог)"], row["E-mail"], status,
+        ]
 
-            self.tree.insert("", "end", iid=str(idx), values=values, tags=tuple(tags))
+        zebra = "zebra0" if (pos % 2 == 0) else "zebra1"
+        tags = [zebra]
 
-        items = self.tree.get_children()
-        if items:
-            self.tree.selection_set(items[0])
-            self.tree.focus(items[0])
-            self.tree.see(items[0])
+        if status == STATUS_OK:
+            tags.append("ok")
+        else:
+            if not g_ok:
+                tags.append("bad_gender")
+            if not e_ok:
+                tags.append("bad_email")
+        return values, tuple(tags)
+
+    def update_row(self, idx: int):
+        """Строка изменилась: перерисовать только её, счётчики — чуть позже одним разом."""
+        self.table.update_row(idx)
+        if self._status_after_id is not None:
+            try:
+                self.after_cancel(self._status_after_id)
+            except Exception:
+                pass
+        self._status_after_id = self.after(300, self._refresh_status_later)
 
-        self.refresh_preview()
+    def _refresh_status_later(self):
+        self._status_after_id = None
         self._refresh_everything()
 
     def _autofit_columns(self, sample_rows: int = 200):
@@ -536,8 +719,7 @@ class PostcardApp(tk.Tk):
         except Exception:
             font = tkfont.nametofont("TkDefaultFont")
 
-        items = self.tree.get_children()
-        sample = items[:sample_rows]
+        sample = self.tree.get_children()[:sample_rows]  # видимое окно таблицы
         min_w = 55
         pad = 26
         max_w = {"Статус": 620, "E-mail": 520, "✓": 60}
@@ -568,15 +750,13 @@ class PostcardApp(tk.Tk):
         idx = int(rowid)
 
         if col_name == "✓":
-            self.model.df.at[idx, "Отправлять"] = not bool(self.model.df.at[idx, "Отправлять"])
-            self.refresh_table()
-            self.tree.selection_set(str(idx))
+            self.model.set_cell(idx, "Отправлять", not bool(self.model.df.at[idx, "Отправлять"]))
+            self.update_row(idx)
             return
 
         if col_name == "Пол":
-            self.model.df.at[idx, "Пол (итог)"] = toggle_gender(self.model.df.at[idx, "Пол (итог)"])
-            self.refresh_table()
-            self.tree.selection_set(str(idx))
+            self.model.set_cell(idx, "Пол (итог)", toggle_gender(self.model.df.at[idx, "Пол (итог)"]))
+            self.update_row(idx)
             return
 
     def on_tree_double_click(self, event):
@@ -612,11 +792,10 @@ class PostcardApp(tk.Tk):
         ent.focus_set()
 
         def commit(*_):
-            self.model.df.at[idx, "E-mail"] = norm_str(var.get())
+            self.model.set_cell(idx, "E-mail", norm_str(var.get()))
             ent.destroy()
             self._edit_widget = None
-            self.refresh_table()
-            self.tree.selection_set(str(idx))
+            self.update_row(idx)
 
         ent.bind("<Return>", commit)
         ent.bind("<FocusOut>", commit)
@@ -625,6 +804,24 @@ class PostcardApp(tk.Tk):
     # -------------------------
     # Preview
     # -------------------------
+    def open_contact_sheet(self):
+        if self.model.df is None or not self.view_idx:
+            messagebox.showinfo("Миниатюры", "Нет строк.")
+            return
+        try:
+            preview_dir = self.model.result_dir("PREVIEW")
+            entries = []
+            for idx in self.view_idx:
+                pdf = self.model.pdf_path_for_idx(idx)
+                entries.append((idx, os.path.splitext(os.path.basename(pdf))[0], pdf))
+        except Exception as e:
+            messagebox.showerror("Миниатюры", str(e))
+            return
+        ContactSheet(self, entries, preview_dir, self._select_row)
+
+    def _select_row(self, idx: int):
+        self.table.select(idx)
+
     def _on_canvas_configure(self, _event):
         if self._preview_after_id is not None:
             try:
@@ -638,20 +835,18 @@ class PostcardApp(tk.Tk):
         self.canvas.delete("all")
         self.pdf_cache_imgtk = None
         self.preview_title.configure(text="—")
+        self.preview_renderer.cancel()  # старая строка уже не нужна
 
         if self.model.df is None:
             self._draw_empty_preview("Загрузите Excel.")
             return
 
-        items = list(self.tree.get_children())
-        if not items:
+        items = self.table.rows
+        idx = self.table.current()
+        if idx is None:
             self._draw_empty_preview("Нет строк.")
             return
 
-        sel = self.tree.selection()
-        iid = sel[0] if sel else items[0]
-        idx = int(iid)
-
         try:
             pdf_path = self.model.pdf_path_for_idx(idx)
         except Exception:
@@ -664,13 +859,57 @@ class PostcardApp(tk.Tk):
             self._draw_empty_preview("PDF не найден.\nСоберите PDF (Windows) или откройте RESULT/PDF.")
             return
 
-        try:
-            cw = max(500, self.canvas.winfo_width())
-            ch = max(500, self.canvas.winfo_height())
-            self.pdf_cache_imgtk = render_pdf_page_to_photoimage(pdf_path, 0, cw, ch)
-            self.canvas.create_image(cw // 2, ch // 2, image=self.pdf_cache_imgtk, anchor="center")
-        except Exception as e:
-            self._draw_empty_preview(f"Не удалось отрисовать PDF:\n{e}")
+        cw = max(500, self.canvas.winfo_width())
+        ch = max(500, self.canvas.winfo_height())
+        self._preview_ctx = (items, idx, cw, ch)
+        img = self.preview_cache.peek(pdf_path, 0, cw, ch)
+        if img is not None:
+            self._show_preview_image(img)
+            self._prefetch_neighbors(items, idx, cw, ch)
+            return
+
+        # растр — в фоновом потоке: сначала черновик, потом полное качество
+        self._draw_empty_preview("Загрузка…")
+        self.preview_renderer.submit(pdf_path, 0, cw, ch)
+        if self._preview_poll_id is None:
+            self._preview_poll_id = self.after(15, self._poll_preview)
+
+    def _poll_preview(self):
+        self._preview_poll_id = None
+        for _gen, kind, payload in self.preview_renderer.poll():
+            if kind == "error":
+                self.canvas.delete("all")
+                self._draw_empty_preview(f"Не удалось отрисовать PDF:\n{payload}")
+            else:
+                self._show_preview_image(payload)
+                if kind == "final" and self._preview_ctx is not None:
+                    self._prefetch_neighbors(*self._preview_ctx)
+        if self.preview_renderer.busy() or not self.preview_renderer.results.empty():
+            self._preview_poll_id = self.after(15, self._poll_preview)
+
+    def _show_preview_image(self, img):
+        cw = max(500, self.canvas.winfo_width())
+        ch = max(500, self.canvas.winfo_height())
+        self.canvas.delete("all")
+        self.pdf_cache_imgtk = ImageTk.PhotoImage(img)
+        self.canvas.create_image(cw // 2, ch // 2, image=self.pdf_cache_imgtk, anchor="center")
+
+    def _prefetch_neighbors(self, items: list[int], idx: int, cw: int, ch: int):
+        """Соседние строки рисуются в фоне — стрелками по таблице превью появляется сразу."""
+        if items is not self.table.rows:
+            return  # набор строк уже сменился
+        pos = self.table.position(idx)
+        if pos is None:
+            return
+        paths = []
+        for d in range(1, PREVIEW_PREFETCH + 1):
+            for j in (pos + d, pos - d):  # вниз — чаще
+                if 0 <= j < len(items):
+                    try:
+                        paths.append(self.model.pdf_path_for_idx(items[j]))
+                    except Exception:
+                        pass
+        self.preview_cache.prefetch(paths, cw, ch)
 
     def _draw_empty_preview(self, text: str):
         cw = max(500, self.canvas.winfo_width())
@@ -696,16 +935,10 @@ class PostcardApp(tk.Tk):
         only_sel = bool(self.tc_only_selected_var.get())
         indices = None
         if only_sel:
-            sel = list(self.tree.selection())
-            if not sel:
+            indices = self.table.selection()
+            if not indices:
                 messagebox.showinfo("Tatcenter", "Включено «только выделенные» — выдели строки и повтори.")
                 return
-            indices = []
-            for iid in sel:
-                try:
-                    indices.append(int(iid))
-                except Exception:
-                    pass
 
         if not messagebox.askyesno("Tatcenter", "Запускаем поиск на tatcenter.ru?"):
             return
@@ -719,7 +952,7 @@ class PostcardApp(tk.Tk):
             prog.set_text(t)
 
         try:
-            res = self.ctrl.tatcenter_fetch(indices, p, msg, pause=1.0)
+            res = self.ctrl.tatcenter_fetch(indices, p, msg)
         finally:
             try:
                 prog.destroy()
@@ -733,7 +966,27 @@ class PostcardApp(tk.Tk):
             f"Найдено e-mail: {res['found']}\n"
             f"Не найдено: {res['not_found']}\n"
             f"Ошибки: {res['errors']}\n"
+            f"Из кэша (без запросов): {res['cached']}\n"
         )
+        if res.get("reordered"):
+            msg_txt += f"Узнано по кэшу с другим порядком слов в ФИО: {res['reordered']}\n"
+        if res.get("by_candidate"):
+            msg_txt += f"Похожее ФИО из кэша, подтверждённое страницей человека: {res['by_candidate']}\n"
+        if res.get("dedup_saved"):
+            msg_txt += (
+                f"Уникальных ФИО: {res['unique']} из {res['total']} строк — "
+                f"дубли сэкономили запросов: {res['dedup_saved']}\n"
+            )
+        if res.get("resumed"):
+            msg_txt += f"Продолжено после прерванного запуска: {res['resumed']} строк уже были обработаны\n"
+        http = res.get("http")
+        if http and http["requests"]:
+            msg_txt += (
+                f"\nЗапросов: {http['requests']} (повторов {http['retries']}, не изменилось {http['not_modified']})\n"
+                f"Время ответа: среднее {http['avg_ms']} мс, p95 {http['p95_ms']} мс, макс {http['max_ms']} мс\n"
+            )
+        if res.get("error_messages"):
+            msg_txt += "\nОшибки (первые):\n" + "\n".join(res["error_messages"])
         messagebox.showinfo("Tatcenter", msg_txt)
 
     def apply_tatcenter(self):
@@ -758,9 +1011,13 @@ class PostcardApp(tk.Tk):
             def msg(t):
                 prog.set_text(t)
 
-            out_dir = self.ctrl.generate_docx(text, p, msg)
+            res = self.ctrl.generate_docx(text, p, msg)
             prog.destroy()
-            messagebox.showinfo("DOCX", f"Готово. DOCX сохранены в:\n{out_dir}")
+            messagebox.showinfo(
+                "DOCX",
+                f"Готово. Собрано: {res['built']}, без изменений: {res['skipped']}.\n"
+                f"DOCX сохранены в:\n{res['dir']}",
+            )
             self._refresh_everything()
         except Exception as e:
             try:
@@ -771,12 +1028,33 @@ class PostcardApp(tk.Tk):
             messagebox.showerror("DOCX", str(e))
 
     def generate_pdf(self):
+        prog = None
         try:
-            out_dir = self.ctrl.generate_pdf()
-            messagebox.showinfo("PDF", f"Готово. PDF сохранены в:\n{out_dir}")
+            text = self.common_text.get("1.0", "end").rstrip("\n")
+            prog = ProgressDialog(self, "Генерация PDF")
+            prog.set_total(len(self.model.df) if self.model.df is not None else 1)
+
+            def p(n, total):
+                prog.set_progress(n, total)
+
+            def msg(t):
+                prog.set_text(t)
+
+            res = self.ctrl.generate_pdf(text, p, msg)
+            prog.destroy()
+            msg_txt = f"Готово. Собрано: {res['built']}, без изменений: {res['skipped']}.\n"
+            if res["errors"]:
+                msg_txt += f"Ошибки: {res['errors']}\n" + "\n".join(res["error_messages"]) + "\n"
+            msg_txt += f"PDF сохранены в:\n{res['dir']}"
+            messagebox.showinfo("PDF", msg_txt)
             self._refresh_everything()
             self.refresh_preview()
         except Exception as e:
+            try:
+                if prog is not None:
+                    prog.destroy()
+            except Exception:
+                pass
             messagebox.showerror("PDF", str(e))
 
     def open_result(self):
@@ -798,14 +1076,82 @@ class PostcardApp(tk.Tk):
         except Exception as e:
             messagebox.showerror("Экспорт PDF", str(e))
 
+    def merge_print_pdf(self):
+        prog = None
+        try:
+            only_checked = messagebox.askyesnocancel(
+                "PDF для печати",
+                "Только отмеченные (✓)?\n\nДа — только отмеченные, Нет — все строки текущего вида таблицы.",
+            )
+            if only_checked is None:
+                return
+            out_path = filedialog.asksaveasfilename(
+                title="Куда сохранить PDF для печати?", defaultextension=".pdf",
+                filetypes=[("PDF", "*.pdf")], initialfile="Открытки_печать.pdf",
+            )
+            if not out_path:
+                return
+            prog = ProgressDialog(self, "PDF для печати")
+
+            def p(n, total):
+                prog.set_progress(n, total)
+
+            def msg(t):
+                prog.set_text(t)
+
+            res = self.ctrl.merge_print_pdf(list(self.view_idx), only_checked, out_path, p, msg)
+            prog.destroy()
+            messagebox.showinfo(
+                "PDF для печати",
+                f"Открыток: {res['files']} (страниц {res['pages']}), не найдено PDF: {res['missing']}\n"
+                f"Размер: {res['size'] / 1048576:.1f} МБ (по отдельности {res['src_size'] / 1048576:.1f} МБ)\n\n"
+                f"{res['out']}",
+            )
+        except Exception as e:
+            try:
+                if prog is not None:
+                    prog.destroy()
+            except Exception:
+                pass
+            messagebox.showerror("PDF для печати", str(e))
+
+    def optimize_pdfs(self):
+        prog = None
+        try:
+            prog = ProgressDialog(self, "Сжатие PDF")
+
+            def p(n, total):
+                prog.set_progress(n, total)
+
+            def msg(t):
+                prog.set_text(t)
+
+            res = self.ctrl.optimize_pdfs(p, msg)
+            prog.destroy()
+            msg_txt = (
+                f"Сжато: {res['optimized']}, уже были сжаты: {res['skipped']}\n"
+                f"Сэкономлено: {res['saved'] / 1048576:.1f} МБ"
+            )
+            if res["errors"]:
+                msg_txt += f"\n\nОшибки: {res['errors']}\n" + "\n".join(res["error_messages"])
+            messagebox.showinfo("Сжатие PDF", msg_txt)
+            self._refresh_everything()
+        except Exception as e:
+            try:
+                if prog is not None:
+                    prog.destroy()
+            except Exception:
+                pass
+            messagebox.showerror("Сжатие PDF", str(e))
+
     def send_test_one(self):
         if self.model.df is None:
             return
-        sel = self.tree.selection()
+        sel = self.table.selection()
         if not sel:
             messagebox.showwarning("Тест", "Выберите строку.")
             return
-        idx = int(sel[0])
+        idx = sel[0]
         try:
             sender = norm_str(self.sender_var.get()) or self.model.state.sender_email
             subject = norm_str(self.subject_var.get()) or "Поздравление"
@@ -841,9 +1187,10 @@ class PostcardApp(tk.Tk):
             self._refresh_accounts()
             return
 
-        total = len(df)
-        g_empty = int((df["Пол (итог)"].apply(norm_str) == "").sum())
-        e_bad = int((~df["E-mail"].apply(lambda x: is_email_like(norm_str(x)))).sum())
+        counts = self.model.status_counts()
+        total = counts["total"]
+        g_empty = counts["no_gender"]
+        e_bad = counts["bad_email"]
 
         self.st_data.configure(text=f"Данные: {total}", style="StatusOK.TLabel")
         self.st_gender.configure(
@@ -855,24 +1202,48 @@ class PostcardApp(tk.Tk):
             style=("StatusOK.TLabel" if e_bad == 0 else "StatusWarn.TLabel"),
         )
 
-        pdf_count = 0
-        if self.model.state.project_dir:
-            try:
-                pdf_dir = self.model.result_dir("PDF")
-                if os.path.isdir(pdf_dir):
-                    pdf_count = len([f for f in os.listdir(pdf_dir) if f.lower().endswith(".pdf")])
-            except Exception:
-                pdf_count = 0
+        try:
+            pdf_count = self.ctrl.pdf_count()
+        except Exception:
+            pdf_count = 0
 
+        # сколько открыток устарело (данные/шаблон/текст поменялись после сборки)
+        stale = None
+        try:
+            stale = self.ctrl.stale_counts(self.common_text.get("1.0", "end"))
+        except Exception:
+            stale = None
+        stale_n = max(stale["docx"], stale["pdf"]) if stale else 0
+
+        pdf_text = f"PDF: {pdf_count}" if pdf_count else "PDF: нет"
+        if stale_n:
+            pdf_text += f" (устарело {stale_n})"
         self.st_pdf.configure(
-            text=(f"PDF: {pdf_count}" if pdf_count else "PDF: нет"),
-            style=("StatusOK.TLabel" if pdf_count else "StatusWarn.TLabel"),
+            text=pdf_text,
+            style=("StatusOK.TLabel" if pdf_count and not stale_n else "StatusWarn.TLabel"),
         )
 
         self._refresh_accounts()
         self._set_buttons_enabled(True)
 
+    def _load_accounts(self):
+        """Перечитать аккаунты Outlook в фоне; список в поле обновится сам."""
+        if not WIN:
+            return
+        self.ctrl.accounts.refresh()
+        if self._accounts_poll_id is None:
+            self._accounts_poll_id = self.after(200, self._poll_accounts)
+
+    def _poll_accounts(self):
+        self._accounts_poll_id = None
+        busy = self.ctrl.accounts.busy()
+        if self.ctrl.accounts.poll():
+            self._refresh_accounts()
+        if busy:
+            self._accounts_poll_id = self.after(200, self._poll_accounts)
+
     def _refresh_accounts(self):
+        """Значения поля «От кого» из кэша аккаунтов (Outlook здесь не трогается)."""
         accs = self.ctrl.outlook_accounts() if WIN else []
         cur = norm_str(self.sender_var.get())
         base_default = self.model.state.sender_email
@@ -895,18 +1266,23 @@ class PostcardApp(tk.Tk):
 
         self.btn_tc.configure(state=("normal" if has_excel else "disabled"))
         self.btn_apply_tc.configure(state=("normal" if has_excel else "disabled"))
-        self.btn_docx.configure(state=("normal" if (has_excel and has_template and has_project) else "disabled"))
+        pdf_template = has_template and self.model.template_is_pdf()
+        self.btn_docx.configure(
+            state=("normal" if (has_excel and has_template and has_project and not pdf_template) else "disabled")
+        )
+        # PDF-шаблон собирается без Word, DOCX — Word'ом или LibreOffice
+        self.btn_pdf.configure(state=("normal" if (has_excel and has_project and self.ctrl.can_build_pdf()) else "disabled"))
 
         if WIN and has_excel and has_project:
-            self.btn_pdf.configure(state="normal")
             self.btn_test.configure(state="normal")
             self.btn_send_checked.configure(state="normal")
             self.btn_send_all.configure(state="normal")
         else:
-            self.btn_pdf.configure(state="disabled")
             self.btn_test.configure(state="disabled")
             self.btn_send_checked.configure(state="disabled")
             self.btn_send_all.configure(state="disabled")
 
         self.btn_open.configure(state=("normal" if has_project else "disabled"))
         self.btn_export.configure(state=("normal" if has_project else "disabled"))
+        self.btn_print.configure(state=("normal" if (has_excel and has_project) else "disabled"))
+        self.btn_optimize.configure(state=("normal" if (has_excel and has_project) else "disabled"))
@@ -7,14 +7,18 @@ from tkinter import messagebox
 EMAIL_RE = re.compile(r"[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}", re.UNICODE)
 RE_ILLEGAL_FS = re.compile(r'[<>:"/\\|?*\x00-\x1F]')
 
+_YO_TABLE = str.maketrans("Ёё", "Ее")
+
 def norm_str(s) -> str:
     if s is None:
         return ""
-    s = str(s).replace("\u00A0", " ")
-    s = s.strip()
-    s = re.sub(r"\s+", " ", s)
-    s = s.replace("Ё", "Е").replace("ё", "е")
-    return s
+    # split() режет по тем же символам, что \s в re (включая NBSP \u00A0):
+    # это strip + схлопывание пробелов за один проход
+    return " ".join(str(s).split()).translate(_YO_TABLE)
+
+def fio_key(fio: str) -> str:
+    """Ключ для сравнения ФИО: norm_str + нижний регистр."""
+    return norm_str(fio).lower()
 
 def sanitize_filename(name: str) -> str:
     name = norm_str(name)
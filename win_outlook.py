@@ -1,4 +1,5 @@
 import os
+import threading
 from config import WIN
 from utils import norm_str
 
@@ -7,6 +8,11 @@ try:
 except Exception:
     win32com = None
 
+try:
+    import pythoncom  # type: ignore
+except Exception:
+    pythoncom = None
+
 def outlook_list_accounts() -> list[str]:
     if not WIN or win32com is None:
         return []
@@ -23,6 +29,58 @@ def outlook_list_accounts() -> list[str]:
         pass
     return accs
 
+class AccountRegistry:
+    """
+    Кэш учётных записей Outlook. Запуск Outlook через COM и перебор аккаунтов
+    идёт в фоновом потоке по refresh(); accounts всегда отдаётся сразу
+    (пока не загрузились — пустой список). poll() — для after() в UI.
+    """
+    def __init__(self, loader=outlook_list_accounts):
+        self._loader = loader
+        self.accounts: list[str] = []
+        self.loaded = False
+        self.error = None
+        self._thread = None
+        self._fresh = False
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Перечитать аккаунты в фоне (если уже читаются — ничего не делает)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._load, name="outlook-accounts", daemon=True)
+            self._thread.start()
+
+    def busy(self) -> bool:
+        with self._lock:
+            return self._thread is not None
+
+    def _load(self):
+        accs, err = [], None
+        if pythoncom is not None:
+            pythoncom.CoInitialize()  # COM в своём потоке
+        try:
+            accs = self._loader()
+        except Exception as e:
+            err = str(e) or e.__class__.__name__
+        finally:
+            if pythoncom is not None:
+                pythoncom.CoUninitialize()
+        with self._lock:
+            if err is None:
+                self.accounts = accs
+            self.error = err
+            self.loaded = True
+            self._fresh = True
+            self._thread = None
+
+    def poll(self) -> bool:
+        """True один раз после каждой завершённой загрузки."""
+        with self._lock:
+            fresh, self._fresh = self._fresh, False
+            return fresh
+
 def outlook_send_mail(from_account_smtp: str, to_email: str, subject: str, body: str, attachment_path: str) -> None:
     if not WIN or win32com is None:
         raise RuntimeError("Отправка через Outlook доступна только на Windows (Outlook + pywin32).")
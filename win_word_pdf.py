@@ -6,25 +6,43 @@ try:
 except Exception:
     win32com = None
 
-def word_export_pdf_batch(docx_paths: list[str], pdf_paths: list[str]) -> None:
+def word_open():
+    """Отдельный (DispatchEx) невидимый экземпляр Word."""
     if not WIN or win32com is None:
         raise RuntimeError("Экспорт DOCX→PDF через Word доступен только на Windows (pywin32).")
-
     word = win32com.client.DispatchEx("Word.Application")
     word.Visible = False
     word.DisplayAlerts = 0
+    return word
+
+def word_export_one(word, docx: str, pdf: str) -> None:
+    doc = word.Documents.Open(os.path.abspath(docx), ReadOnly=True)
+    try:
+        doc.ExportAsFixedFormat(
+            OutputFileName=os.path.abspath(pdf),
+            ExportFormat=17,
+            OpenAfterExport=False,
+            OptimizeFor=0,
+            CreateBookmarks=1,
+        )
+    finally:
+        doc.Close(False)
+
+def word_pid(word) -> int | None:
+    """PID процесса WINWORD.EXE этого экземпляра (чтобы добить зависший Word)."""
+    try:
+        import win32gui, win32process  # type: ignore
+        caption = f"postcard_app_{os.getpid()}_{id(word)}"
+        word.Caption = caption
+        hwnd = win32gui.FindWindow("OpusApp", caption)
+        return win32process.GetWindowThreadProcessId(hwnd)[1] if hwnd else None
+    except Exception:
+        return None
+
+def word_export_pdf_batch(docx_paths: list[str], pdf_paths: list[str]) -> None:
+    word = word_open()
     try:
         for docx, pdf in zip(docx_paths, pdf_paths):
-            doc = word.Documents.Open(os.path.abspath(docx), ReadOnly=True)
-            try:
-                doc.ExportAsFixedFormat(
-                    OutputFileName=os.path.abspath(pdf),
-                    ExportFormat=17,
-                    OpenAfterExport=False,
-                    OptimizeFor=0,
-                    CreateBookmarks=1,
-                )
-            finally:
-                doc.Close(False)
+            word_export_one(word, docx, pdf)
     finally:
-        word.Quit()
\ No newline at end of file
+        word.Quit()